@@ -0,0 +1,83 @@
+from bisect import bisect_left
+from heapq import nlargest
+
+# Ennyi javaslatot adunk egy leütésre
+MAX_RESULTS = 15
+
+# Az ennél rövidebb előtagokra sok cím illeszkedik, ezek eredményét megjegyezzük
+CACHED_PREFIX_LENGTH = 2
+
+# Minden előtagnál nagyobb karakter, a tartomány felső határához
+PREFIX_END = '\U0010ffff'
+
+
+class AddressIndex:
+    # Rendezett tömb kisbetűs kulcsokkal, mellette a címek és a használatuk száma.
+    # Előtag keresés két bisect-tel, a találatok használat szerint rendezve.
+    def __init__(self, addresses=(), usage=None):
+        counts = dict(usage or {})
+        for address in addresses:
+            counts.setdefault(address, 0)
+        self.fill(counts)
+
+    def fill(self, counts):
+        entries = sorted((address.casefold(), address) for address in counts if address)
+        self.keys = [key for key, _ in entries]
+        self.names = [address for _, address in entries]
+        self.counts = [counts[address] for address in self.names]
+        self.cache = {}
+
+    def merge(self, usage):
+        # Az adatbázisból olvasott használat hozzáadódik a közben mentett címekhez
+        counts = dict(zip(self.names, self.counts))
+        for address, count in usage.items():
+            address = (address or "").strip()
+            counts[address] = counts.get(address, 0) + count
+        self.fill(counts)
+
+    def search(self, prefix, limit=MAX_RESULTS):
+        key = prefix.strip().casefold()
+        if not key:
+            return []
+        results = self.cache.get(key)
+        if results is None:
+            first = bisect_left(self.keys, key)
+            last = bisect_left(self.keys, key + PREFIX_END, first)
+            # Azonos használatnál marad a betűrend
+            best = nlargest(limit, range(first, last), key=self.counts.__getitem__)
+            results = [self.names[i] for i in best]
+            if len(key) <= CACHED_PREFIX_LENGTH:
+                self.cache[key] = results
+        return results
+
+    def find(self, address):
+        key = address.casefold()
+        index = bisect_left(self.keys, key)
+        while index < len(self.keys) and self.keys[index] == key:
+            if self.names[index] == address:
+                return index
+            index += 1
+        return -1
+
+    def use(self, address, count=1):
+        # Mentéskor a cím használata nő, új cím a helyére kerül
+        address = address.strip()
+        if not address:
+            return
+        index = self.find(address)
+        if index >= 0:
+            self.counts[index] += count
+        else:
+            key = address.casefold()
+            index = bisect_left(self.keys, key)
+            self.keys.insert(index, key)
+            self.names.insert(index, address)
+            self.counts.insert(index, count)
+        self.cache.clear()
+
+    def remove(self, address):
+        # Csak a még soha nem használt cím tűnik el a javaslatok közül
+        index = self.find(address)
+        if index >= 0 and self.counts[index] == 0:
+            del self.keys[index], self.names[index], self.counts[index]
+            self.cache.clear()
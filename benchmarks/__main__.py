@@ -0,0 +1,202 @@
+# Teljesítménymérés generált adatokon, a repó gyökeréből futtatva:
+#   python -m benchmarks --out eredmeny.json
+#   python -m benchmarks --compare elozo.json --out eredmeny.json
+# A felület képernyő nélkül fut (QT_QPA_PLATFORM=offscreen), az adatbázis egy
+# ideiglenes mappába kerül, a valódi fuvarok.db-hez nem nyúl.
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Ennyivel lassabb medián számít visszaesésnek az összevetésnél
+REGRESSION_RATIO = 1.10
+
+
+class Bench:
+    def __init__(self, app, window, repository, data, workdir, repeat):
+        self.app = app
+        self.window = window
+        self.repository = repository
+        self.data = data
+        self.workdir = workdir
+        self.repeat = repeat
+        self.results = {}
+
+    def measure(self, name, fn, ops=1, setup=None, runs=None):
+        # fn futásai külön mérve; a setup ideje nem számít bele
+        times = []
+        for _ in range(runs or self.repeat):
+            if setup:
+                setup()
+            started = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - started)
+        self.record(name, times, ops)
+
+    def record(self, name, times, ops=1):
+        median = statistics.median(times)
+        self.results[name] = {
+            'runs_ms': [round(t * 1000, 3) for t in times],
+            'min_ms': round(min(times) * 1000, 3),
+            'median_ms': round(median * 1000, 3),
+            'ops': ops,
+            'ops_per_second': round(ops / median, 1) if median > 0 else None,
+        }
+        print(f"{name:<28} {median * 1000:>10.2f} ms  (min {min(times) * 1000:.2f}, "
+              f"{len(times)} futás, {ops} művelet)", flush=True)
+
+
+def gitCommit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, dirty
+
+
+def headless(messages):
+    # Modális üzenetablakok helyett naplózás; ismétlődő szállítószámnál "Igen"
+    from PySide6.QtWidgets import QMessageBox
+
+    def log(kind, answer=None):
+        return staticmethod(lambda *args, **kwargs: (messages.append((kind, args[1:3])), answer)[1])
+
+    QMessageBox.information = log('info')
+    QMessageBox.warning = log('warning')
+    QMessageBox.question = log('question', QMessageBox.Yes)
+
+
+def startWindow(app, bench_results):
+    import main
+
+    started = time.perf_counter()
+    window = main.FuvarAdminApp()
+    # Az első kirajzolás után épülnek a táblázatok, addig nem használható
+    while not window.button_frame.isEnabled():
+        app.processEvents()
+    bench_results.record('startup_interactive', [time.perf_counter() - started])
+    return window
+
+
+def compare(baseline_path, results):
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f"\nÖsszevetés: {baseline['meta'].get('commit')} -> {results['meta'].get('commit')}")
+    if baseline['meta'].get('params') != results['meta']['params']:
+        print(f"Eltérő paraméterek: {baseline['meta'].get('params')} -> {results['meta']['params']}")
+    regressions = 0
+    for name, result in results['results'].items():
+        old = baseline['results'].get(name)
+        if not old:
+            print(f"{name:<28} {result['median_ms']:>10.2f} ms  (új)")
+            continue
+        ratio = result['median_ms'] / old['median_ms'] if old['median_ms'] else 1.0
+        flag = ""
+        if ratio > REGRESSION_RATIO:
+            flag = "  LASSABB"
+            regressions += 1
+        print(f"{name:<28} {old['median_ms']:>10.2f} -> {result['median_ms']:>10.2f} ms  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def buildParser():
+    from benchmarks.cases import CASES
+
+    parser = argparse.ArgumentParser(prog="benchmarks", description="Teljesítménymérés generált adatokon")
+    parser.add_argument('--out', help="eredmények mentése JSON fájlba")
+    parser.add_argument('--compare', help="korábbi eredmény JSON, ehhez viszonyítva")
+    parser.add_argument('--years', type=int, default=3, help="ennyi év előzménye (alapértelmezés: %(default)s)")
+    parser.add_argument('--addresses', type=int, default=20000, help="címjegyzék mérete (alapértelmezés: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=5, help="futások száma mérésenként (alapértelmezés: %(default)s)")
+    parser.add_argument('--seed', type=int, default=1, help="az adatgenerálás magja")
+    parser.add_argument('--only', nargs='+', choices=list(CASES), help="csak ezek a mérések")
+    parser.add_argument('--keep', action='store_true', help="az ideiglenes mappa megtartása")
+    return parser
+
+
+def main(argv=None):
+    sys.path.insert(0, ROOT)
+    args = buildParser().parse_args(argv)
+    out_path = os.path.abspath(args.out) if args.out else None
+    compare_path = os.path.abspath(args.compare) if args.compare else None
+
+    # A PySide6 első importja előtt kell beállítani
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6 import __version__ as pyside_version
+    from PySide6.QtWidgets import QApplication
+    from repository import getRepository, closeRepository
+    from benchmarks.cases import CASES
+    from benchmarks.synthetic import SyntheticData
+
+    workdir = tempfile.mkdtemp(prefix="fuvar_bench_")
+    previous_dir = os.getcwd()
+    os.chdir(workdir)
+    try:
+        started = time.perf_counter()
+        data = SyntheticData(years=args.years, addresses=args.addresses, seed=args.seed)
+        repository = getRepository()
+        dataset = data.populate(repository)
+        dataset['addresses'] = len(data.addresses)
+        dataset['factories'] = len(data.factories)
+        print(f"Adatok: {dataset} ({time.perf_counter() - started:.1f} s)", flush=True)
+
+        app = QApplication.instance() or QApplication(sys.argv[:1])
+        messages = []
+        headless(messages)
+        bench = Bench(app, None, repository, data, workdir, args.repeat)
+        bench.window = startWindow(app, bench)
+        for name in args.only or CASES:
+            CASES[name](bench)
+
+        commit, dirty = gitCommit()
+        results = {
+            'meta': {
+                'commit': commit,
+                'dirty': dirty,
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'pyside6': pyside_version,
+                'sqlite': sqlite3.sqlite_version,
+                'platform': platform.platform(),
+                'params': {'years': args.years, 'addresses': args.addresses,
+                           'repeat': args.repeat, 'seed': args.seed},
+            },
+            'dataset': dataset,
+            'results': bench.results,
+        }
+        warnings = [message for message in messages if message[0] == 'warning']
+        if warnings:
+            print(f"Figyelmeztetések a futás közben: {warnings}", file=sys.stderr)
+
+        if out_path:
+            with open(out_path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+            print(f"Eredmények: {out_path}")
+        regressions = compare(compare_path, results) if compare_path else 0
+
+        bench.window.close()
+        closeRepository()
+    finally:
+        os.chdir(previous_dir)
+        if args.keep:
+            print(f"Munkamappa: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+# A mért műveletek. Mindegyik a Bench.measure hívással rögzíti az idejét,
+# a felületet érintők a valódi FuvarAdminApp widgetjein keresztül futnak.
+import os
+import tracemalloc
+from datetime import date
+from itertools import count as counter
+
+from PySide6.QtCore import QDate, QThreadPool, QTime
+from month_models import MONTH_CACHE_SIZE
+from delivery_store import DeliveryStore
+
+
+def settle(bench):
+    # Megvárja a háttérszálakat és a tőlük érkező jelzések feldolgozását
+    window = bench.window
+    QThreadPool.globalInstance().waitForDone()
+    while window.jobs.jobs or window.running_prefetches:
+        bench.app.processEvents()
+        QThreadPool.globalInstance().waitForDone(10)
+    bench.app.processEvents()
+
+
+def monthsOf(year):
+    return [(year, month) for month in range(1, 13)]
+
+
+def saveDelivery(bench, count=200):
+    window = bench.window
+    today = QDate.currentDate()
+    window.showMonth(today.year(), today.month())
+    window.date_edit.setDate(today)
+    window.km_combo.setCurrentIndex(1)
+    window.factory_combo.setCurrentIndex(0)
+    runs = counter()
+
+    def run():
+        run_index = next(runs)
+        for i in range(count):
+            window.address_input.setText(bench.data.addresses[i % len(bench.data.addresses)])
+            window.delivery_input.setText(f"B{run_index}-{i:05d}")
+            window.m3_values = [8.0]
+            window.saveDeliveryData()
+        # A mérés a háttérszál commitjáig tart
+        window.write_queue.flush()
+
+    bench.measure('save_delivery', run, ops=count)
+    settle(bench)
+
+
+def saveWorkHours(bench, count=200):
+    window = bench.window
+    today = QDate.currentDate()
+    first = QDate(today.year(), today.month(), 1)
+    window.start_time.setTime(QTime(6, 0))
+    window.end_time.setTime(QTime(14, 30))
+
+    def run():
+        for i in range(count):
+            window.date_edit.setDate(first.addDays(i % first.daysInMonth()))
+            window.saveWorkHours()
+        window.write_queue.flush()
+
+    bench.measure('save_work_hours', run, ops=count)
+    settle(bench)
+
+
+def monthGrid(bench):
+    window = bench.window
+    year = date.today().year - 1
+    months = monthsOf(year)
+
+    runs = counter()
+
+    def clear():
+        window.month_cache.clear()
+        for key in list(window.prefetch_jobs):
+            window.cancelPrefetch(key)
+        settle(bench)
+
+    def cold():
+        # Üres gyorsítótárból: adatbázis olvasás, árazás, modell és nézet
+        window.showMonth(*months[next(runs) % len(months)])
+
+    bench.measure('month_grid_cold', cold, setup=clear, runs=len(months))
+    settle(bench)
+
+    # Annyi hónap között váltunk, amennyi a szomszédok előtöltésével együtt
+    # is elfér a gyorsítótárban
+    cached_months = months[:MONTH_CACHE_SIZE - 2]
+    for year_month in cached_months:
+        window.showMonth(*year_month)
+        settle(bench)
+
+    def cached():
+        for year_month in cached_months:
+            window.showMonth(*year_month)
+
+    bench.measure('month_grid_cached', cached, ops=len(cached_months))
+    settle(bench)
+
+
+def excelExport(bench):
+    window = bench.window
+    today = date.today()
+    window.showMonth(today.year, today.month)
+
+    def month():
+        window.saveToExcel()
+        settle(bench)
+
+    bench.measure('excel_export_month', month)
+
+    first_day, last_day = date(today.year - 1, 1, 1), date(today.year - 1, 12, 31)
+    path = os.path.join(bench.workdir, 'export_year.xlsx')
+
+    def year():
+        window.exportRangeToExcel(first_day, last_day, path)
+        settle(bench)
+
+    bench.measure('excel_export_year', year)
+
+
+def excelImport(bench):
+    # Az előző év exportja, majd a tárolt napok törlése után visszatöltés
+    window = bench.window
+    year = date.today().year - 1
+    first_day, last_day = date(year, 1, 1), date(year, 12, 31)
+    path = os.path.join(bench.workdir, 'import_year.xlsx')
+    window.exportRangeToExcel(first_day, last_day, path)
+    settle(bench)
+
+    def clear():
+        with bench.repository.transaction() as conn:
+            conn.execute("DELETE FROM work_hours WHERE date BETWEEN ? AND ?",
+                         (str(first_day), str(last_day)))
+            conn.execute("DELETE FROM deliveries WHERE date BETWEEN ? AND ?",
+                         (str(first_day), str(last_day)))
+
+    def load():
+        window.loadDataFromExcel(path)
+        settle(bench)
+
+    bench.measure('excel_import_year', load, setup=clear)
+
+
+def databaseManager(bench):
+    from database_manager import DatabaseManager
+
+    dialogs = []
+
+    def open_dialog():
+        dialog = DatabaseManager(bench.window)
+        dialog.tabs.setCurrentIndex(1)
+        dialogs.append(dialog)
+
+    bench.measure('db_manager_open', open_dialog)
+    dialog = dialogs[-1]
+    tab = dialog.addresses_tab
+
+    def reload():
+        tab.reload()
+
+    bench.measure('db_manager_reload', reload)
+
+    def scroll():
+        # Az összes cím betöltése lapról lapra
+        tab.reload()
+        while tab.has_more:
+            tab.loadMore()
+
+    bench.measure('db_manager_scroll_all', scroll, ops=len(bench.data.addresses))
+
+    def sort_and_filter():
+        tab.sortBy(2)
+        tab.sortBy(2)
+        tab.sortBy(1)
+        tab.filter_input.setText(bench.data.addresses[0][:6])
+        tab.applyFilter()
+        tab.filter_input.setText("")
+        tab.applyFilter()
+
+    bench.measure('db_manager_sort_filter', sort_and_filter, ops=5)
+
+    def add_and_delete(count=20):
+        # Szűrt nézetben az összes felvett sor látszik, így törölhető is
+        tab.filter_input.setText("Benchmark utca")
+        tab.applyFilter()
+        for i in range(count):
+            tab.name_input.setText(f"Benchmark utca {i}")
+            tab.price_input.setValue(1000)
+            tab.addRow()
+        while tab.rows:
+            tab.view.selectRow(0)
+            tab.deleteRow()
+
+    bench.measure('db_manager_add_delete', add_and_delete, ops=40)
+    for dialog in dialogs:
+        dialog.deleteLater()
+    settle(bench)
+
+
+def deliveryStore(bench):
+    # A teljes generált időszak az oszlopos tárban, csoportosítás és szűrés
+    repository = bench.repository
+    first_day, last_day = bench.data.first_day, bench.data.last_day
+    stores = []
+
+    def load():
+        stores[:] = [DeliveryStore.fromRepository(repository, first_day, last_day)]
+
+    bench.measure('delivery_store_load', load)
+    store = stores[0]
+    bench.measure('delivery_store_group_month', lambda: store.groupBy('month'), ops=len(store))
+    bench.measure('delivery_store_group_zone', lambda: store.groupBy('zone'), ops=len(store))
+    bench.measure('delivery_store_group_factory', lambda: store.groupBy('factory'), ops=len(store))
+    year_first = date(last_day.year, 1, 1)
+    zone, factory = store.zones.values[0], store.factories.values[0]
+    bench.measure('delivery_store_filter_year',
+                  lambda: store.totals(store.select(year_first, last_day, zone, factory)), ops=len(store))
+
+    # Memória összevetés a dict soros betöltéssel
+    tracemalloc.start()
+    rows = repository.deliveriesBetween(first_day, last_day)
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del rows
+    print(f"{'delivery_store_memory':<28} {store.nbytes() / 1024:>10.0f} KiB  "
+          f"(dict sorok: {dict_bytes / 1024:.0f} KiB, {len(store)} fuvar)", flush=True)
+
+
+CASES = {
+    'save_delivery': saveDelivery,
+    'save_work_hours': saveWorkHours,
+    'month_grid': monthGrid,
+    'excel_export': excelExport,
+    'excel_import': excelImport,
+    'db_manager': databaseManager,
+    'delivery_store': deliveryStore,
+}
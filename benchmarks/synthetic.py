@@ -0,0 +1,95 @@
+# Valószerű, de generált adatok a mérésekhez: több év munkaórái és fuvarjai
+# övezetek és gyárak szerint, valamint nagy címjegyzék. Azonos mag (seed)
+# mellett mindig ugyanaz az adat készül, így a futások összevethetők.
+import random
+from datetime import date, timedelta
+
+from repository import ADDRESS_SAVE, FACTORY_SAVE, ZONE_SAVE
+
+STREETS = ["Fő", "Kossuth Lajos", "Petőfi Sándor", "Rákóczi", "Ady Endre", "Széchenyi",
+           "Arany János", "Dózsa György", "Béke", "Vasút", "Ipari", "Malom", "Szőlő", "Kert"]
+TOWNS = ["Budapest", "Debrecen", "Szeged", "Miskolc", "Pécs", "Győr", "Nyíregyháza",
+         "Kecskemét", "Székesfehérvár", "Szombathely", "Eger", "Sopron", "Tata", "Vác"]
+STREET_TYPES = ["utca", "út", "tér", "köz"]
+FACTORY_NAMES = ["Holcim", "Duna-Dráva Cement", "CRH", "Lafarge", "Heidelberg", "Mapei",
+                 "Baumit", "Cemex", "Readymix", "Betonpartner"]
+WORK_TYPES = ["Sima munkanap", "Sima munkanap", "Sima munkanap", "Sima munkanap", "Műhely nap"]
+# Az alapértelmezett 5 km-es sávok, a távolabbiak ritkábbak
+ZONES = [f"Övezet {start}-{start + 5}" for start in range(0, 50, 5)]
+ZONE_WEIGHTS = [30, 25, 15, 10, 7, 5, 3, 2, 2, 1]
+
+
+class SyntheticData:
+    def __init__(self, years=3, addresses=20000, factories=len(FACTORY_NAMES), seed=1,
+                 last_day=None):
+        self.random = random.Random(seed)
+        self.last_day = last_day or date.today()
+        self.first_day = date(self.last_day.year - years + 1, 1, 1)
+        self.factories = [f"{FACTORY_NAMES[i % len(FACTORY_NAMES)]}{'' if i < len(FACTORY_NAMES) else f' {i}'}"
+                          for i in range(factories)]
+        self.addresses = self.addressBook(addresses)
+        self.delivery_number = 0
+
+    def addressBook(self, count):
+        names = set()
+        while len(names) < count:
+            names.add(f"{self.random.choice(TOWNS)}, {self.random.choice(STREETS)} "
+                      f"{self.random.choice(STREET_TYPES)} {self.random.randint(1, 250)}")
+        return sorted(names)
+
+    def workDays(self):
+        day = self.first_day
+        while day <= self.last_day:
+            if day.weekday() < 5:
+                yield day
+            day += timedelta(days=1)
+
+    def address(self):
+        # Kevés cím sokszor, a többi ritkán (Pareto-szerű eloszlás)
+        index = int(len(self.addresses) * min(self.random.paretovariate(1.2) - 1, 9.99) / 10)
+        return self.addresses[index]
+
+    def workHours(self, day):
+        start = self.random.choice([5, 6, 6, 7]) * 60 + self.random.choice([0, 15, 30])
+        end = start + self.random.randint(7 * 60, 11 * 60)
+        return {
+            'date': day.isoformat(),
+            'start_time': f"{start // 60:02d}:{start % 60:02d}",
+            'end_time': f"{end // 60 % 24:02d}:{end % 60:02d}",
+            'type': self.random.choice(WORK_TYPES)
+        }
+
+    def delivery(self, day):
+        self.delivery_number += 1
+        loads = self.random.randint(1, 3)
+        return {
+            'date': day.isoformat(),
+            'km_range': self.random.choices(ZONES, ZONE_WEIGHTS)[0],
+            'factory': self.random.choice(self.factories),
+            'address': self.address(),
+            'delivery_number': f"SZ{self.delivery_number:07d}",
+            'm3_values': [self.random.choice([4.0, 6.0, 7.5, 8.0, 9.0, 10.0]) for _ in range(loads)]
+        }
+
+    def rows(self, deliveries_per_day=(3, 8)):
+        work_rows, delivery_rows = [], []
+        for day in self.workDays():
+            work_rows.append(self.workHours(day))
+            for _ in range(self.random.randint(*deliveries_per_day)):
+                delivery_rows.append(self.delivery(day))
+        return work_rows, delivery_rows
+
+    def populate(self, repository):
+        # Törzsadatok és előzmények egyetlen tranzakcióban
+        work_rows, delivery_rows = self.rows()
+        with repository.transaction() as conn:
+            conn.executemany(FACTORY_SAVE, [(name, self.random.randint(15, 40) * 100)
+                                            for name in self.factories])
+            conn.executemany(ZONE_SAVE, [(zone, (i + 1) * 1500) for i, zone in enumerate(ZONES)])
+            # Csak a címek egy részének van egyedi ára, a többinél a gyár díja számít
+            conn.executemany(ADDRESS_SAVE, [
+                (address, self.random.randint(20, 60) * 100 if self.random.random() < 0.2 else 0)
+                for address in self.addresses])
+            repository.insertWorkHours(work_rows)
+            repository.insertDeliveries(delivery_rows)
+        return {'work_hours': len(work_rows), 'deliveries': len(delivery_rows)}
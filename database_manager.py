@@ -1,218 +1,233 @@
+from bisect import bisect_left
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QWidget, QFormLayout,
     QLineEdit, QSpinBox, QPushButton, QHBoxLayout,
-    QTableWidget, QTabWidget, QTableWidgetItem
+    QTableWidget, QTabWidget, QTableWidgetItem, QAbstractItemView
 )
-from PySide6.QtCore import Qt
-import sqlite3
+from PySide6.QtCore import Qt, QTimer
+from repository import getRepository, MASTER_PAGE_SIZE
+from master_data import TABLES, getMasterData
+from profiler import timed
 
-class DatabaseManager(QDialog):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.conn = sqlite3.connect('fuvarok.db')
-        self.initUI()
-        
-    def initUI(self):
-        self.setWindowTitle("Törzsadat Kezelő")
-        self.setMinimumWidth(800)
-        self.setMinimumHeight(600)
-        
-        layout = QVBoxLayout()
-        
-        # Tab widget létrehozása
-        tabs = QTabWidget()
-        tabs.addTab(self.createFactoriesTab(), "Gyárak")
-        tabs.addTab(self.createAddressesTab(), "Címek")
-        tabs.addTab(self.createZonesTab(), "Övezetek")
-        layout.addWidget(tabs)
-        
-        self.setLayout(layout)
+# Gépelés után ennyi ms-mal indul a szűrés
+FILTER_DELAY_MS = 200
 
-    def createFactoriesTab(self):
-        widget = QWidget()
+# Az SQLite NOCASE és LIKE csak az ASCII betűket hasonlítja kisbetűsen
+ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+def asciiFold(text):
+    return (text or '').translate(ASCII_LOWER)
+
+
+class MasterTab(QWidget):
+    # Egy törzsadat tábla lapja. Az adatbázis rendez és szűr (indexszel), a
+    # sorok lapokban érkeznek görgetés közben. Felvétel és törlés után csak az
+    # érintett sor változik a táblázatban.
+    def __init__(self, repository, master_data, table, labels, headers):
+        super().__init__()
+        self.repository = repository
+        self.master_data = master_data
+        self.table = table
+        self.key_column, self.price_column = TABLES[table]
+        self.columns = ['id', self.key_column, self.price_column]
+        self.sort_column = self.key_column
+        self.descending = False
+        self.prefix = ''
+        self.rows = []
+        self.has_more = False
+        self.loaded = False
+        self.initUI(labels, headers)
+
+    def initUI(self, labels, headers):
         layout = QVBoxLayout()
-        
+
         # Adatbeviteli mezők
         form_layout = QFormLayout()
-        self.factory_name = QLineEdit()
-        self.factory_price = QSpinBox()
-        self.factory_price.setRange(0, 1000000)
-        form_layout.addRow("Gyár neve:", self.factory_name)
-        form_layout.addRow("Fuvardíj:", self.factory_price)
-        
+        self.name_input = QLineEdit()
+        self.price_input = QSpinBox()
+        self.price_input.setRange(0, 1000000)
+        form_layout.addRow(labels[0], self.name_input)
+        form_layout.addRow(labels[1], self.price_input)
+
         # Gombok
         btn_layout = QHBoxLayout()
         add_btn = QPushButton("Hozzáadás")
-        add_btn.clicked.connect(self.addFactory)
+        add_btn.clicked.connect(self.addRow)
         delete_btn = QPushButton("Törlés")
-        delete_btn.clicked.connect(self.deleteFactory)
+        delete_btn.clicked.connect(self.deleteRow)
         btn_layout.addWidget(add_btn)
         btn_layout.addWidget(delete_btn)
-        
-        # Táblázat
-        self.factory_table = QTableWidget()
-        self.factory_table.setColumnCount(3)
-        self.factory_table.setHorizontalHeaderLabels(["ID", "Név", "Fuvardíj"])
-        
-        layout.addLayout(form_layout)
-        layout.addLayout(btn_layout)
-        layout.addWidget(self.factory_table)
-        widget.setLayout(layout)
-        
-        self.loadFactories()
-        return widget
-
-    def createAddressesTab(self):
-        widget = QWidget()
-        layout = QVBoxLayout()
-        
-        form_layout = QFormLayout()
-        self.address = QLineEdit()
-        self.address_price = QSpinBox()
-        self.address_price.setRange(0, 1000000)
-        form_layout.addRow("Cím:", self.address)
-        form_layout.addRow("Egyedi ár:", self.address_price)
-        
-        btn_layout = QHBoxLayout()
-        add_btn = QPushButton("Hozzáadás")
-        add_btn.clicked.connect(self.addAddress)
-        delete_btn = QPushButton("Törlés")
-        delete_btn.clicked.connect(self.deleteAddress)
-        btn_layout.addWidget(add_btn)
-        btn_layout.addWidget(delete_btn)
-        
-        self.address_table = QTableWidget()
-        self.address_table.setColumnCount(3)
-        self.address_table.setHorizontalHeaderLabels(["ID", "Cím", "Ár"])
-        
-        layout.addLayout(form_layout)
-        layout.addLayout(btn_layout)
-        layout.addWidget(self.address_table)
-        widget.setLayout(layout)
-        
-        self.loadAddresses()
-        return widget
-
-    def createZonesTab(self):
-        widget = QWidget()
-        layout = QVBoxLayout()
-        
-        form_layout = QFormLayout()
-        self.zone_name = QLineEdit()
-        self.zone_price = QSpinBox()
-        self.zone_price.setRange(0, 1000000)
-        form_layout.addRow("Övezet:", self.zone_name)
-        form_layout.addRow("Alapdíj:", self.zone_price)
-        
-        btn_layout = QHBoxLayout()
-        add_btn = QPushButton("Hozzáadás")
-        add_btn.clicked.connect(self.addZone)
-        delete_btn = QPushButton("Törlés")
-        delete_btn.clicked.connect(self.deleteZone)
-        btn_layout.addWidget(add_btn)
-        btn_layout.addWidget(delete_btn)
-        
-        self.zone_table = QTableWidget()
-        self.zone_table.setColumnCount(3)
-        self.zone_table.setHorizontalHeaderLabels(["ID", "Név", "Alapdíj"])
-        
+
+        # Szűrés név elejére
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Szűrés...")
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DELAY_MS)
+        self.filter_timer.timeout.connect(self.applyFilter)
+        self.filter_input.textChanged.connect(self.filter_timer.start)
+
+        # Táblázat, rendezés a fejlécre kattintva
+        self.view = QTableWidget()
+        self.view.setColumnCount(3)
+        self.view.setHorizontalHeaderLabels(headers)
+        self.view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        header = self.view.horizontalHeader()
+        header.setSortIndicatorShown(True)
+        header.setSortIndicator(1, Qt.AscendingOrder)
+        header.sectionClicked.connect(self.sortBy)
+        self.view.verticalScrollBar().valueChanged.connect(self.onScrolled)
+
         layout.addLayout(form_layout)
         layout.addLayout(btn_layout)
-        layout.addWidget(self.zone_table)
-        widget.setLayout(layout)
-        
-        self.loadZones()
-        return widget
-
-    def addFactory(self):
-        name = self.factory_name.text()
-        price = self.factory_price.value()
-        if name and price:
-            cursor = self.conn.cursor()
-            cursor.execute("INSERT INTO factories (nev, fuvardij) VALUES (?, ?)", (name, price))
-            self.conn.commit()
-            self.loadFactories()
-            self.factory_name.clear()
-            self.factory_price.setValue(0)
-
-    def addAddress(self):
-        address = self.address.text()
-        price = self.address_price.value()
-        if address and price:
-            cursor = self.conn.cursor()
-            cursor.execute("INSERT INTO addresses (cim, ar) VALUES (?, ?)", (address, price))
-            self.conn.commit()
-            self.loadAddresses()
-            self.address.clear()
-            self.address_price.setValue(0)
-
-    def addZone(self):
-        name = self.zone_name.text()
-        price = self.zone_price.value()
+        layout.addWidget(self.filter_input)
+        layout.addWidget(self.view)
+        self.setLayout(layout)
+
+    # Betöltés
+    def ensureLoaded(self):
+        # Az első megjelenéskor töltődik be
+        if not self.loaded:
+            self.loaded = True
+            self.reload()
+
+    @timed()
+    def reload(self):
+        self.rows = []
+        self.view.setRowCount(0)
+        self.loadMore()
+
+    @timed()
+    def loadMore(self):
+        after = self.rows[-1] if self.rows else None
+        page = self.repository.masterPage(self.table, self.sort_column, self.descending,
+                                          self.prefix, after)
+        self.has_more = len(page) == MASTER_PAGE_SIZE
+        first = len(self.rows)
+        self.rows.extend(page)
+        self.view.setRowCount(len(self.rows))
+        for row, data in enumerate(page, first):
+            self.setRowItems(row, data)
+
+    def onScrolled(self, value):
+        if self.has_more and value >= self.view.verticalScrollBar().maximum():
+            self.loadMore()
+
+    def setRowItems(self, row, data):
+        for col, column in enumerate(self.columns):
+            value = data[column]
+            self.view.setItem(row, col, QTableWidgetItem("" if value is None else str(value)))
+
+    def applyFilter(self):
+        prefix = self.filter_input.text().strip()
+        if prefix != self.prefix:
+            self.prefix = prefix
+            self.reload()
+
+    def sortBy(self, section):
+        column = self.columns[section]
+        if column == self.sort_column:
+            self.descending = not self.descending
+        else:
+            self.sort_column = column
+            self.descending = False
+        self.view.horizontalHeader().setSortIndicator(
+            section, Qt.DescendingOrder if self.descending else Qt.AscendingOrder)
+        self.reload()
+
+    # Soronkénti frissítés
+    def sortKey(self, data):
+        # Ugyanaz a sorrend, mint a Repository.masterPage rendezése
+        if self.sort_column == self.key_column:
+            value = asciiFold(data[self.key_column])
+        elif self.sort_column == self.price_column:
+            value = data[self.price_column] or 0
+        else:
+            value = data['id']
+        return (value, data['id'])
+
+    def insertRow(self, data):
+        if not asciiFold(data[self.key_column]).startswith(asciiFold(self.prefix)):
+            return
+        # Csökkenő rendezésnél a kulcsok negálása helyett fordított listában keresünk
+        keys = [self.sortKey(row) for row in self.rows]
+        if self.descending:
+            keys.reverse()
+        index = bisect_left(keys, self.sortKey(data))
+        if self.descending:
+            index = len(keys) - index
+        # A betöltött részen túli sor a következő lappal érkezik majd
+        if index == len(self.rows) and self.has_more:
+            return
+        self.rows.insert(index, data)
+        self.view.insertRow(index)
+        self.setRowItems(index, data)
+
+    def removeRow(self, row_id):
+        for index, data in enumerate(self.rows):
+            if data['id'] == row_id:
+                del self.rows[index]
+                self.view.removeRow(index)
+                return
+
+    @timed()
+    def addRow(self):
+        name = self.name_input.text()
+        price = self.price_input.value()
         if name and price:
-            cursor = self.conn.cursor()
-            cursor.execute("INSERT INTO zones (nev, alapdij) VALUES (?, ?)", (name, price))
-            self.conn.commit()
-            self.loadZones()
-            self.zone_name.clear()
-            self.zone_price.setValue(0)
-
-    def deleteFactory(self):
-        selected = self.factory_table.selectedItems()
-        if selected:
-            row = selected[0].row()
-            id_item = self.factory_table.item(row, 0)
-            if id_item:
-                cursor = self.conn.cursor()
-                cursor.execute("DELETE FROM factories WHERE id=?", (id_item.text(),))
-                self.conn.commit()
-                self.loadFactories()
-
-    def deleteAddress(self):
-        selected = self.address_table.selectedItems()
-        if selected:
-            row = selected[0].row()
-            id_item = self.address_table.item(row, 0)
-            if id_item:
-                cursor = self.conn.cursor()
-                cursor.execute("DELETE FROM addresses WHERE id=?", (id_item.text(),))
-                self.conn.commit()
-                self.loadAddresses()
-
-    def deleteZone(self):
-        selected = self.zone_table.selectedItems()
+            # A közös gyorsítótáron át, így a főablak is értesül róla
+            data = self.master_data.add(self.table, name, price)
+            # Meglévő névnél az ár változott, a sor a helyére kerül
+            self.removeRow(data['id'])
+            self.insertRow(data)
+            self.name_input.clear()
+            self.price_input.setValue(0)
+
+    @timed()
+    def deleteRow(self):
+        selected = self.view.selectedItems()
         if selected:
             row = selected[0].row()
-            id_item = self.zone_table.item(row, 0)
-            if id_item:
-                cursor = self.conn.cursor()
-                cursor.execute("DELETE FROM zones WHERE id=?", (id_item.text(),))
-                self.conn.commit()
-                self.loadZones()
-
-    def loadFactories(self):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM factories")
-        self.factory_table.setRowCount(0)
-        for row, data in enumerate(cursor.fetchall()):
-            self.factory_table.insertRow(row)
-            for col, item in enumerate(data):
-                self.factory_table.setItem(row, col, QTableWidgetItem(str(item)))
-
-    def loadAddresses(self):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM addresses")
-        self.address_table.setRowCount(0)
-        for row, data in enumerate(cursor.fetchall()):
-            self.address_table.insertRow(row)
-            for col, item in enumerate(data):
-                self.address_table.setItem(row, col, QTableWidgetItem(str(item)))
-
-    def loadZones(self):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM zones")
-        self.zone_table.setRowCount(0)
-        for row, data in enumerate(cursor.fetchall()):
-            self.zone_table.insertRow(row)
-            for col, item in enumerate(data):
-                self.zone_table.setItem(row, col, QTableWidgetItem(str(item)))
\ No newline at end of file
+            row_id = self.rows[row]['id']
+            self.master_data.delete(self.table, row_id)
+            self.removeRow(row_id)
+
+
+class DatabaseManager(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        repository = getRepository()
+        self.repository = repository
+        self.master_data = getMasterData(repository)
+        self.initUI()
+
+    def initUI(self):
+        self.setWindowTitle("Törzsadat Kezelő")
+        self.setMinimumWidth(800)
+        self.setMinimumHeight(600)
+
+        layout = QVBoxLayout()
+
+        # Tab widget létrehozása, a lapok adatai csak megnyitáskor töltődnek be
+        self.factories_tab = MasterTab(self.repository, self.master_data, 'factories',
+                                       ("Gyár neve:", "Fuvardíj:"), ["ID", "Név", "Fuvardíj"])
+        self.addresses_tab = MasterTab(self.repository, self.master_data, 'addresses',
+                                       ("Cím:", "Egyedi ár:"), ["ID", "Cím", "Ár"])
+        self.zones_tab = MasterTab(self.repository, self.master_data, 'zones',
+                                   ("Övezet:", "Alapdíj:"), ["ID", "Név", "Alapdíj"])
+        self.tabs = QTabWidget()
+        self.tabs.addTab(self.factories_tab, "Gyárak")
+        self.tabs.addTab(self.addresses_tab, "Címek")
+        self.tabs.addTab(self.zones_tab, "Övezetek")
+        self.tabs.currentChanged.connect(self.onTabChanged)
+        layout.addWidget(self.tabs)
+
+        self.setLayout(layout)
+        self.onTabChanged(self.tabs.currentIndex())
+
+    def onTabChanged(self, index):
+        tab = self.tabs.widget(index)
+        if tab is not None:
+            tab.ensureLoaded()
@@ -0,0 +1,74 @@
+# Szállítószámok ismétlődésének felismerése.
+# A számozás évente újraindulhat, ezért az ismétlődést évenként nézzük.
+
+
+def periodOf(date_text):
+    # 'yyyy-MM-dd' -> 'yyyy'
+    return date_text[:4]
+
+
+def periodRange(period):
+    return f"{period}-01-01", f"{period}-12-31"
+
+
+class DeliveryNumberIndex:
+    # (időszak, szállítószám) -> dátumok listája, időszakonként az első
+    # lekérdezéskor töltődik be az adatbázisból
+    def __init__(self, repository):
+        self.repository = repository
+        self.numbers = {}
+        self.periods = set()
+
+    def loadPeriod(self, period):
+        if period in self.periods:
+            return
+        self.periods.add(period)
+        for row in self.repository.deliveryNumbersBetween(*periodRange(period)):
+            # A régi, szóközökkel mentett számok is egyezzenek
+            number = (row['delivery_number'] or '').strip()
+            if number:
+                self.numbers.setdefault((period, number), []).append(row['date'])
+
+    def dates(self, date_text, number):
+        # Azok a napok, amikor ez a szám az időszakban már szerepelt
+        number = number.strip()
+        if not number:
+            return []
+        period = periodOf(date_text)
+        self.loadPeriod(period)
+        return self.numbers.get((period, number), [])
+
+    def add(self, date_text, number):
+        number = number.strip()
+        if number:
+            period = periodOf(date_text)
+            self.loadPeriod(period)
+            self.numbers.setdefault((period, number), []).append(date_text)
+
+    def invalidate(self):
+        # Tömeges import után az időszakok újra betöltődnek
+        self.numbers.clear()
+        self.periods.clear()
+
+
+def findDuplicates(rows):
+    # Egyetlen menet a teljes előzményen: (időszak, szám) -> fuvarok, ahol több van
+    groups = {}
+    for row in rows:
+        number = (row['delivery_number'] or '').strip()
+        if number:
+            groups.setdefault((periodOf(row['date']), number), []).append(row)
+    return {key: group for key, group in groups.items() if len(group) > 1}
+
+
+def exactRepeats(group):
+    # Egy csoporton belül a teljesen azonos sorok azonosítói, az első megtartásával
+    seen = set()
+    repeats = []
+    for row in group:
+        key = (row['date'], row['km_range'], row['factory'], row['address'], row['m3_values'])
+        if key in seen:
+            repeats.append(row['id'])
+        else:
+            seen.add(key)
+    return repeats
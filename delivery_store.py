@@ -0,0 +1,156 @@
+# Tömör, oszlopos tárolás a fuvarokhoz több éves elemzéshez. Soronként:
+#   nap      int32, a date.toordinal() értéke
+#   övezet   uint16 szótárkód (a zoneKey szerint, "Övezet 0-5" és "0-5" egy kód)
+#   gyár     uint16 szótárkód
+#   cím      uint32 szótárkód
+#   m3       float32 összeg, az egyes értékek egy közös float32 tömbben,
+#            a sor értékei m3_values[m3_offsets[i]:m3_offsets[i + 1]]
+# A sorok nap szerint rendezettek, így az időszak szűrés bisect, az övezet,
+# gyár és cím szerinti csoportosítás pedig a szótár soronkénti listáiból megy.
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from itertools import compress
+import json
+
+from pricing import Dictionary, zoneKey
+
+GROUPS = ('zone', 'factory', 'address', 'day', 'month', 'year')
+
+
+def ordinal(day):
+    if isinstance(day, str):
+        day = date.fromisoformat(day[:10])
+    return day.toordinal()
+
+
+def nextMonth(day_number):
+    day = date.fromordinal(day_number)
+    index = day.year * 12 + day.month
+    return date(index // 12, index % 12 + 1, 1).toordinal()
+
+
+def nextYear(day_number):
+    return date(date.fromordinal(day_number).year + 1, 1, 1).toordinal()
+
+
+# Időszakos csoportosításnál: a következő időszak első napja és a felirat
+PERIODS = {
+    'day': (lambda day_number: day_number + 1, lambda day: day.isoformat()),
+    'month': (nextMonth, lambda day: f"{day:%Y-%m}"),
+    'year': (nextYear, lambda day: str(day.year)),
+}
+
+
+class DeliveryStore:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.days = array('i')
+        self.zone_codes = array('H')
+        self.factory_codes = array('H')
+        self.address_codes = array('I')
+        self.m3_totals = array('f')
+        self.m3_offsets = array('I', [0])
+        self.m3_values = array('f')
+        self.zones = Dictionary()
+        self.factories = Dictionary()
+        self.addresses = Dictionary()
+
+    def __len__(self):
+        return len(self.days)
+
+    @classmethod
+    def fromRepository(cls, repository, first_day, last_day):
+        # Évenként olvasva, így egyszerre csak egy év nyers sorai vannak a memóriában
+        store = cls()
+        for year in range(first_day.year, last_day.year + 1):
+            span_first = max(first_day, date(year, 1, 1))
+            span_last = min(last_day, date(year, 12, 31))
+            store.addRows(repository.deliveryColumnsBetween(span_first, span_last))
+        return store
+
+    def addRows(self, rows):
+        # rows: (dátum, övezet, gyár, cím, m3_values JSON) sorok, dátum szerint rendezve
+        for date_text, zone, factory, address, m3_json in rows:
+            self.append(ordinal(date_text), zone, factory, address, json.loads(m3_json or '[]'))
+
+    def append(self, day_number, zone, factory, address, m3_values):
+        # A bisect alapú szűrés rendezett napokat feltételez
+        index = len(self.days)
+        if index and day_number < self.days[-1]:
+            raise ValueError(f"A sorok nem dátum szerint rendezettek: {date.fromordinal(day_number)}")
+        self.days.append(day_number)
+        self.zone_codes.append(self.zones.encode(zoneKey(zone), index))
+        self.factory_codes.append(self.factories.encode(factory or "", index))
+        self.address_codes.append(self.addresses.encode(address or "", index))
+        self.m3_values.extend(m3_values)
+        self.m3_offsets.append(len(self.m3_values))
+        self.m3_totals.append(sum(m3_values))
+
+    def nbytes(self):
+        # A tömbök és a szótárak mérete bájtban (a szótárak szövegei nélkül)
+        arrays = [self.days, self.zone_codes, self.factory_codes, self.address_codes,
+                  self.m3_totals, self.m3_offsets, self.m3_values]
+        for dictionary in [self.zones, self.factories, self.addresses]:
+            arrays.extend(dictionary.rows)
+        return sum(len(values) * values.itemsize for values in arrays)
+
+    # Szűrés
+    def rowRange(self, first_day=None, last_day=None):
+        # Az időszak sorai egy összefüggő [lo, hi) tartomány
+        lo = bisect_left(self.days, ordinal(first_day)) if first_day else 0
+        hi = bisect_right(self.days, ordinal(last_day)) if last_day else len(self.days)
+        return lo, max(lo, hi)
+
+    def codeRows(self, dictionary, key, lo, hi):
+        # Egy kód sorai a tartományon belül; a soronkénti listák növekvő sorrendűek
+        code = dictionary.codes.get(key)
+        if code is None:
+            return array('I')
+        rows = dictionary.rows[code]
+        return rows[bisect_left(rows, lo):bisect_left(rows, hi)]
+
+    def select(self, first_day=None, last_day=None, zone=None, factory=None):
+        # A feltételeknek megfelelő sorok indexei
+        lo, hi = self.rowRange(first_day, last_day)
+        if zone is not None:
+            rows = self.codeRows(self.zones, zoneKey(zone), lo, hi)
+            if factory is not None:
+                code = self.factories.codes.get(factory, -1)
+                rows = array('I', compress(rows, map(code.__eq__, map(self.factory_codes.__getitem__, rows))))
+            return rows
+        if factory is not None:
+            return self.codeRows(self.factories, factory, lo, hi)
+        return array('I', range(lo, hi))
+
+    def totals(self, rows):
+        # (fuvarszám, m3) a megadott sorokra
+        return len(rows), sum(map(self.m3_totals.__getitem__, rows))
+
+    # Csoportosítás
+    def groupBy(self, group, first_day=None, last_day=None):
+        # [(felirat, fuvarszám, m3)], övezet/gyár/cím szerint név, időszak szerint időrendben
+        lo, hi = self.rowRange(first_day, last_day)
+        if group in PERIODS:
+            return self.periodTotals(group, lo, hi)
+        dictionary = {'zone': self.zones, 'factory': self.factories, 'address': self.addresses}[group]
+        result = []
+        for value, rows in zip(dictionary.values, dictionary.rows):
+            rows = rows[bisect_left(rows, lo):bisect_left(rows, hi)]
+            if rows:
+                result.append((value,) + self.totals(rows))
+        return sorted(result)
+
+    def periodTotals(self, group, lo, hi):
+        # A rendezett napokon időszakonként egy bisect, az összeg tömb szeletből
+        next_start, label = PERIODS[group]
+        result = []
+        start = lo
+        while start < hi:
+            day_number = self.days[start]
+            end = bisect_left(self.days, next_start(day_number), start, hi)
+            result.append((label(date.fromordinal(day_number)), end - start, sum(self.m3_totals[start:end])))
+            start = end
+        return result
@@ -0,0 +1,126 @@
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QCheckBox, QPushButton, QLabel,
+    QTableWidget, QTableWidgetItem, QTabWidget, QFileDialog, QMessageBox,
+    QAbstractItemView
+)
+from PySide6.QtCore import Qt, QTimer
+
+# Ennyi legutóbbi szakasz jelenik meg a részletes listában
+RECENT_SPANS = 500
+
+# Nyitott ablaknál ilyen gyakran frissül (ms)
+REFRESH_INTERVAL_MS = 2000
+
+SUMMARY_HEADERS = ["Művelet", "Hívás", "Összes (ms)", "Átlag (ms)", "Max (ms)", "Sorok", "SQL (ms)"]
+RECENT_HEADERS = ["Kezdet (ms)", "Művelet", "Idő (ms)", "Sorok", "SQL (ms)", "SQL hívás", "Szál"]
+
+
+def numberItem(value, text_format="{:.2f}"):
+    item = QTableWidgetItem("" if value is None else text_format.format(value))
+    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+    return item
+
+
+class DiagnosticsDialog(QDialog):
+    # Rejtett diagnosztika ablak (Ctrl+Shift+D): a mérés be- és kikapcsolása,
+    # összesítés műveletenként, a legutóbbi szakaszok és JSON trace mentése
+    def __init__(self, profiler, parent=None):
+        super().__init__(parent)
+        self.profiler = profiler
+        self.initUI()
+        self.timer = QTimer(self)
+        self.timer.setInterval(REFRESH_INTERVAL_MS)
+        self.timer.timeout.connect(self.refresh)
+
+    def initUI(self):
+        self.setWindowTitle("Diagnosztika")
+        self.setMinimumWidth(900)
+        self.setMinimumHeight(500)
+        layout = QVBoxLayout()
+
+        top_layout = QHBoxLayout()
+        self.enabled_check = QCheckBox("Futásidő mérés bekapcsolva")
+        self.enabled_check.setChecked(self.profiler.enabled)
+        self.enabled_check.toggled.connect(self.profiler.setEnabled)
+        self.status_label = QLabel()
+        top_layout.addWidget(self.enabled_check)
+        top_layout.addStretch()
+        top_layout.addWidget(self.status_label)
+
+        self.summary_table = self.createTable(SUMMARY_HEADERS)
+        self.recent_table = self.createTable(RECENT_HEADERS)
+        tabs = QTabWidget()
+        tabs.addTab(self.summary_table, "Összesítés")
+        tabs.addTab(self.recent_table, "Legutóbbi hívások")
+
+        btn_layout = QHBoxLayout()
+        for text, callback in [("Frissítés", self.refresh), ("Törlés", self.clear),
+                               ("JSON trace mentése", self.saveTrace), ("Bezárás", self.close)]:
+            button = QPushButton(text)
+            button.clicked.connect(callback)
+            btn_layout.addWidget(button)
+
+        layout.addLayout(top_layout)
+        layout.addWidget(tabs)
+        layout.addLayout(btn_layout)
+        self.setLayout(layout)
+
+    def createTable(self, headers):
+        table = QTableWidget()
+        table.setColumnCount(len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.verticalHeader().setVisible(False)
+        return table
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.timer.start()
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        summary = self.profiler.summary()
+        self.summary_table.setRowCount(len(summary))
+        for row, entry in enumerate(summary):
+            self.summary_table.setItem(row, 0, QTableWidgetItem(entry['name']))
+            self.summary_table.setItem(row, 1, numberItem(entry['count'], "{}"))
+            self.summary_table.setItem(row, 2, numberItem(entry['total_ms']))
+            self.summary_table.setItem(row, 3, numberItem(entry['mean_ms']))
+            self.summary_table.setItem(row, 4, numberItem(entry['max_ms']))
+            self.summary_table.setItem(row, 5, numberItem(entry['rows'], "{}"))
+            self.summary_table.setItem(row, 6, numberItem(entry['sql_ms']))
+
+        # Legfrissebb elöl, a beágyazott hívások behúzva
+        records = self.profiler.records()[-RECENT_SPANS:][::-1]
+        self.recent_table.setRowCount(len(records))
+        for row, record in enumerate(records):
+            self.recent_table.setItem(row, 0, numberItem(record['start_ms'], "{:.1f}"))
+            self.recent_table.setItem(row, 1, QTableWidgetItem("  " * record['depth'] + record['name']))
+            self.recent_table.setItem(row, 2, numberItem(record['duration_ms']))
+            self.recent_table.setItem(row, 3, numberItem(record['rows'], "{}"))
+            self.recent_table.setItem(row, 4, numberItem(record['sql_ms']))
+            self.recent_table.setItem(row, 5, numberItem(record['sql_calls'], "{}"))
+            self.recent_table.setItem(row, 6, QTableWidgetItem(record['thread']))
+        for table in [self.summary_table, self.recent_table]:
+            table.resizeColumnsToContents()
+
+        state = "bekapcsolva" if self.profiler.enabled else "kikapcsolva"
+        self.status_label.setText(f"{len(self.profiler.spans)} / {self.profiler.spans.maxlen} szakasz, mérés {state}")
+
+    def clear(self):
+        self.profiler.clear()
+        self.refresh()
+
+    def saveTrace(self):
+        file_name, _ = QFileDialog.getSaveFileName(
+            self, "JSON trace mentése", "fuvar_trace.json", "JSON files (*.json)"
+        )
+        if file_name:
+            try:
+                events = self.profiler.saveTrace(file_name)
+                QMessageBox.information(self, "Siker", f"{events} esemény mentve: {file_name}")
+            except OSError as e:
+                QMessageBox.warning(self, "Hiba", f"Mentési hiba: {str(e)}")
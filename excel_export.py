@@ -0,0 +1,62 @@
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import NamedStyle, PatternFill, Font
+
+from profiler import timed
+from month_data import (WORK_HEADERS, TRIP_HEADERS, workRows, workSummaryRows, deliveryHeaders, deliveryRows,
+                        tripRows, monthProgress)
+from work_time import SUMMARY_HEADERS
+
+HEADER_STYLE = "fejlec"
+
+
+def headerStyle():
+    # Egyetlen közös, névvel ellátott stílus minden fejléc cellához
+    style = NamedStyle(name=HEADER_STYLE)
+    style.font = Font(bold=True)
+    style.fill = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
+    return style
+
+
+def headerRow(ws, headers):
+    row = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.style = HEADER_STYLE
+        row.append(cell)
+    return row
+
+
+@timed(rows=int)
+def exportRange(repository, first_day, last_day, path, progress=None):
+    # Csak írható munkafüzet: a sorok azonnal a fájlba kerülnek,
+    # nem épül fel a teljes munkafüzet a memóriában
+    wb = Workbook(write_only=True)
+    wb.add_named_style(headerStyle())
+    step = monthProgress(first_day, last_day, progress, 4)
+
+    ws1 = wb.create_sheet(title="Munkaórák")
+    ws1.append(headerRow(ws1, WORK_HEADERS))
+    rows = 0
+    for row in workRows(repository, first_day, last_day, step):
+        ws1.append(row)
+        rows += 1
+
+    ws2 = wb.create_sheet(title="Fuvar adatok")
+    ws2.append(headerRow(ws2, deliveryHeaders(repository)))
+    for row in deliveryRows(repository, first_day, last_day, step):
+        ws2.append(row)
+        rows += 1
+
+    ws3 = wb.create_sheet(title="Fuvarok")
+    ws3.append(headerRow(ws3, TRIP_HEADERS))
+    for row in tripRows(repository, first_day, last_day, step):
+        ws3.append(row)
+
+    ws4 = wb.create_sheet(title="Munkaidő összesítés")
+    ws4.append(headerRow(ws4, SUMMARY_HEADERS))
+    for row in workSummaryRows(repository, first_day, last_day, step):
+        ws4.append(row)
+
+    wb.save(path)
+    return rows
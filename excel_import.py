@@ -0,0 +1,234 @@
+import re
+import time
+from datetime import date, datetime, time as dtime
+from openpyxl import load_workbook
+from profiler import timed
+from work_time import LEAVE_TYPE, SICK_LEAVE_TYPE
+
+# Munkalap oszlopok: belső név -> lehetséges fejléc feliratok
+WORK_COLUMNS = {
+    'date': ("Dátum",),
+    'start_time': ("Munka KB", "Kezdés"),
+    'end_time': ("Munka BF", "Végzés"),
+    'type': ("Munka típusa",),
+    'workshop_start': ("Műhely KB",),
+    'workshop_end': ("Műhely BF",),
+}
+
+# Fuvar munkalap (fuvaronként egy sor): belső név -> lehetséges fejléc feliratok
+TRIP_COLUMNS = {
+    'date': ("Dátum",),
+    'km_range': ("Övezet",),
+    'factory': ("Gyár",),
+    'address': ("Cím",),
+    'delivery_number': ("Szállítószám",),
+    'm3_values': ("M3",),
+}
+
+# Ennyi beolvasott soronként jelzünk előrehaladást
+PROGRESS_EVERY = 1000
+
+# "(6.0 + 2.5) (8.5)" alakú előnézeti szöveg
+M3_PREVIEW = re.compile(r'^\((.*)\)\s*\((.*)\)$')
+
+
+def dateText(value):
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    text = str(value).strip()[:10]
+    try:
+        return date.fromisoformat(text).isoformat()
+    except ValueError:
+        return None
+
+
+def timeText(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, (datetime, dtime)):
+        return value.strftime('%H:%M')
+    return str(value).strip()[:5]
+
+
+def m3Values(value):
+    if value is None or value == "":
+        return []
+    if isinstance(value, (int, float)):
+        return [float(value)]
+    text = str(value).strip().replace(',', '.')
+    match = M3_PREVIEW.match(text)
+    if match:
+        text = match.group(1).replace('+', ' ')
+    try:
+        return [float(part) for part in text.split()]
+    except ValueError:
+        return []
+
+
+def columnIndexes(header, columns):
+    # A fejléc alapján egyszer határozzuk meg, melyik oszlopban mi van
+    positions = {str(title).strip(): index for index, title in enumerate(header) if title is not None}
+    indexes = {}
+    for name, titles in columns.items():
+        for title in titles:
+            if title in positions:
+                indexes[name] = positions[title]
+                break
+    return indexes
+
+
+def readWorkHours(ws, skip_dates, skipped, progress=None):
+    rows = ws.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        return []
+    indexes = columnIndexes(header, WORK_COLUMNS)
+    if 'date' not in indexes:
+        return []
+
+    def cell(values, name):
+        index = indexes.get(name)
+        return values[index] if index is not None and index < len(values) else None
+
+    result = []
+    for count, values in enumerate(rows):
+        if progress and count % PROGRESS_EVERY == 0:
+            progress(count)
+        raw_date = cell(values, 'date')
+        date_text = dateText(raw_date) if raw_date else None
+        if not date_text:
+            continue
+        if date_text in skip_dates:
+            skipped.append(date_text)
+            continue
+        work_type = cell(values, 'type')
+        start_text, end_text = timeText(cell(values, 'start_time')), timeText(cell(values, 'end_time'))
+        # Szabadság és TP időpontok nélkül is rögzíthető
+        if start_text and end_text or work_type in (LEAVE_TYPE, SICK_LEAVE_TYPE):
+            result.append({'date': date_text, 'start_time': start_text, 'end_time': end_text,
+                           'type': str(work_type) if work_type else "Sima munkanap"})
+        start_text, end_text = timeText(cell(values, 'workshop_start')), timeText(cell(values, 'workshop_end'))
+        if start_text and end_text:
+            result.append({'date': date_text, 'start_time': start_text, 'end_time': end_text,
+                           'type': "Műhely nap"})
+    return result
+
+
+def readDeliveries(ws, skip_dates, skipped, progress=None):
+    # Napi összesítő munkalap: napi és övezetenkénti m3 összeg, fuvaronkénti
+    # adatok nélkül. Csak akkor használjuk, ha a munkafüzetben nincs "Fuvarok" lap.
+    rows = ws.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        return []
+    titles = [str(title).strip() if title is not None else "" for title in header]
+    if "Dátum" not in titles:
+        return []
+    date_index = titles.index("Dátum")
+    # Övezet oszlopok: (oszlop index, övezet neve)
+    zone_columns = [(index, title) for index, title in enumerate(titles) if title.startswith("Övezet")]
+
+    result = []
+    for count, values in enumerate(rows):
+        if progress and count % PROGRESS_EVERY == 0:
+            progress(count)
+        if date_index >= len(values) or not values[date_index]:
+            continue
+        date_text = dateText(values[date_index])
+        if not date_text:
+            continue
+        if date_text in skip_dates:
+            skipped.append(date_text)
+            continue
+        for index, zone in zone_columns:
+            m3_values = m3Values(values[index]) if index < len(values) else []
+            if m3_values:
+                result.append({'date': date_text, 'km_range': zone, 'm3_values': m3_values})
+    return result
+
+
+def readTrips(ws, skip_dates, skipped, progress=None):
+    # Fuvaronként egy sor, gyárral, címmel és szállítószámmal
+    rows = ws.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        return []
+    indexes = columnIndexes(header, TRIP_COLUMNS)
+    if 'date' not in indexes or 'm3_values' not in indexes:
+        return []
+
+    def cell(values, name):
+        index = indexes.get(name)
+        value = values[index] if index is not None and index < len(values) else None
+        return "" if value is None else str(value)
+
+    result = []
+    for count, values in enumerate(rows):
+        if progress and count % PROGRESS_EVERY == 0:
+            progress(count)
+        index = indexes['date']
+        date_text = dateText(values[index]) if index < len(values) and values[index] else None
+        if not date_text:
+            continue
+        if date_text in skip_dates:
+            skipped.append(date_text)
+            continue
+        # Az m3 nélkül rögzített fuvar is fuvar (alapdíjjal számol)
+        index = indexes['m3_values']
+        result.append({'date': date_text, 'km_range': cell(values, 'km_range'),
+                       'factory': cell(values, 'factory'), 'address': cell(values, 'address'),
+                       'delivery_number': cell(values, 'delivery_number'),
+                       'm3_values': m3Values(values[index]) if index < len(values) else []})
+    return result
+
+
+@timed(rows=lambda result: result['rows'])
+def importWorkbook(repository, path, progress=None):
+    # Csak olvasható, soronként bejárt munkafüzet; a már tárolt napokat
+    # kihagyjuk, így ugyanannak a fájlnak az újbóli betöltése nem duplikál
+    started = time.perf_counter()
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        # A fuvaronkénti lap pontos, a napi összesítő lapot csak nélküle olvassuk
+        delivery_sheet = "Fuvarok" if "Fuvarok" in wb.sheetnames else "Fuvar adatok"
+        sheets = [name for name in ("Munkaórák", delivery_sheet) if name in wb.sheetnames]
+        total = sum(wb[name].max_row or 0 for name in sheets)
+        done = [0]
+
+        def sheetProgress(count):
+            if progress:
+                progress(done[0] + count, total)
+
+        # A már tárolt napok sorai kimaradnak, ezek dátumai (soronként egy)
+        skipped = []
+        work_rows, delivery_rows = [], []
+        if "Munkaórák" in wb.sheetnames:
+            work_rows = readWorkHours(wb["Munkaórák"], repository.workHourDates(), skipped, sheetProgress)
+            done[0] += wb["Munkaórák"].max_row or 0
+        if delivery_sheet in wb.sheetnames:
+            read = readTrips if delivery_sheet == "Fuvarok" else readDeliveries
+            delivery_rows = read(wb[delivery_sheet], repository.deliveryDates(), skipped, sheetProgress)
+    finally:
+        wb.close()
+
+    # Megszakítás esetén ez az utolsó pont, ahol még semmi nem íródott ki
+    if progress:
+        progress(total, total)
+
+    # Tömeges írás egyetlen tranzakcióban
+    with repository.transaction():
+        repository.insertWorkHours(work_rows)
+        repository.insertDeliveries(delivery_rows)
+
+    seconds = time.perf_counter() - started
+    rows = len(work_rows) + len(delivery_rows)
+    return {
+        'rows': rows,
+        'seconds': seconds,
+        'rows_per_second': rows / seconds if seconds > 0 else 0,
+        'dates': sorted({row['date'] for row in work_rows + delivery_rows}),
+        'skipped_days': len(set(skipped)),
+        'skipped_rows': len(skipped)
+    }
@@ -0,0 +1,184 @@
+# Grafikus felület nélküli parancssori belépési pont, pl.:
+#   python -m fuvar report --from 2024-01 --to 2024-12
+# Csak az adatbázis és az Excel export modulokat tölti be, a PySide6-ot nem.
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+from repository import DB_PATH, getRepository, closeRepository
+from month_data import monthRange, monthsBetween
+from delivery_store import GROUPS
+
+
+def parseMonth(text):
+    try:
+        year, month = text.split('-')
+        return date(int(year), int(month), 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Hibás hónap: {text} (várt formátum: ÉÉÉÉ-HH)")
+
+
+def report(args):
+    # Lusta import: a többi parancsnak nincs szüksége az openpyxl-re
+    from excel_export import exportRange
+
+    repository = getRepository(args.db)
+    os.makedirs(args.out_dir, exist_ok=True)
+    first_day = args.from_month
+    last_day = monthRange(args.to_month.year, args.to_month.month)[1]
+
+    if args.single:
+        spans = [(first_day, last_day, f"fuvar_{first_day:%Y-%m}_{last_day:%Y-%m}.xlsx")]
+    else:
+        spans = []
+        for year, month in monthsBetween(first_day, last_day):
+            month_first, month_last = monthRange(year, month)
+            spans.append((month_first, month_last, f"fuvar_{year}-{month:02d}.xlsx"))
+
+    started = time.perf_counter()
+    for span_first, span_last, file_name in spans:
+        path = os.path.join(args.out_dir, file_name)
+        rows = exportRange(repository, span_first, span_last, path)
+        print(f"{path}: {rows} sor")
+    print(f"{len(spans)} munkafüzet, {time.perf_counter() - started:.2f} s")
+
+
+def migrate(args):
+    repository = getRepository(args.db)
+    work_rows, delivery_rows = repository.migrateJsonLogs()
+    print(f"Importálva: {work_rows} munkaóra és {delivery_rows} fuvar sor")
+
+
+def schema(args):
+    from migrations import SCHEMA_VERSION
+
+    repository = getRepository(args.db)
+    for step in repository.applied_migrations:
+        print(f"Most lefutott: {step['version']}. {step['name']} ({step['ms']:.1f} ms)")
+    print(f"Séma verzió: {repository.schemaVersion()} (program: {SCHEMA_VERSION})")
+    for row in repository.migrationLog():
+        print(f"  {row['version']:>3}. {row['name']:<40} {row['applied_at']}  {row['ms']:.1f} ms")
+
+
+def summary(args):
+    # Az összesítő táblákból, a nyers fuvarok beolvasása nélkül
+    repository = getRepository(args.db)
+    if args.month:
+        rows = repository.monthSummary(args.month.year, args.month.month)
+        print(f"{args.month:%Y-%m}")
+        for row in rows:
+            print(f"  {row['zone']:>8} {row['factory']:<20} {row['m3']:>9.1f} m3 {row['trips']:>5} fuvar {row['revenue']:>12,.0f} Ft")
+    else:
+        rows = repository.yearSummary(args.year)
+        for row in rows:
+            print(f"{row['month']} {row['m3']:>9.1f} m3 {row['trips']:>5} fuvar {row['revenue']:>12,.0f} Ft")
+    total_m3 = sum(row['m3'] for row in rows)
+    total_trips = sum(row['trips'] for row in rows)
+    total_revenue = sum(row['revenue'] for row in rows)
+    print(f"Összesen: {total_m3:.1f} m3, {total_trips} fuvar, {total_revenue:,.0f} Ft")
+
+
+def analyze(args):
+    # Több éves elemzés az oszlopos tárból, a nyers fuvarokból számolva
+    from delivery_store import DeliveryStore
+
+    repository = getRepository(args.db)
+    first_day = args.from_month
+    last_day = monthRange(args.to_month.year, args.to_month.month)[1]
+    started = time.perf_counter()
+    store = DeliveryStore.fromRepository(repository, first_day, last_day)
+    loaded = time.perf_counter()
+    if args.zone or args.factory:
+        rows = store.select(zone=args.zone, factory=args.factory)
+        print(f"Szűrés: {args.zone or 'minden övezet'}, {args.factory or 'minden gyár'}")
+        trips, m3 = store.totals(rows)
+        print(f"  {trips} fuvar, {m3:.1f} m3")
+    else:
+        for label, trips, m3 in store.groupBy(args.by):
+            print(f"{label:<30} {m3:>10.1f} m3 {trips:>6} fuvar")
+    print(f"{len(store)} fuvar, {store.nbytes() / 1024:.0f} KiB, betöltés {loaded - started:.2f} s, "
+          f"számítás {(time.perf_counter() - loaded) * 1000:.1f} ms")
+
+
+def rebuild(args):
+    repository = getRepository(args.db)
+    started = time.perf_counter()
+    rows = repository.rebuildAggregates()
+    print(f"Összesítők újraszámolva: {rows} napi sor, {time.perf_counter() - started:.2f} s")
+
+
+def duplicates(args):
+    from delivery_numbers import findDuplicates, exactRepeats
+
+    repository = getRepository(args.db)
+    started = time.perf_counter()
+    groups = findDuplicates(repository.deliveriesWithNumber())
+    repeats = []
+    for (period, number), group in sorted(groups.items()):
+        print(f"{period} {number}: {len(group)} fuvar ({', '.join(row['date'] for row in group)})")
+        repeats.extend(exactRepeats(group))
+    print(f"{len(groups)} ismétlődő szállítószám, ebből {len(repeats)} teljesen azonos sor, "
+          f"{time.perf_counter() - started:.2f} s")
+    if args.delete_exact and repeats:
+        repository.deleteDeliveries(repeats)
+        print(f"{len(repeats)} azonos sor törölve")
+
+
+def buildParser():
+    parser = argparse.ArgumentParser(prog="fuvar", description="Fuvar Adminisztráció parancssorból")
+    parser.add_argument('--db', default=DB_PATH, help="adatbázis fájl (alapértelmezés: %(default)s)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    report_parser = commands.add_parser('report', help="Excel kimutatások készítése")
+    report_parser.add_argument('--from', dest='from_month', type=parseMonth, required=True, help="első hónap (ÉÉÉÉ-HH)")
+    report_parser.add_argument('--to', dest='to_month', type=parseMonth, required=True, help="utolsó hónap (ÉÉÉÉ-HH)")
+    report_parser.add_argument('--out-dir', default='.', help="kimeneti mappa")
+    report_parser.add_argument('--single', action='store_true', help="egyetlen munkafüzet a teljes időszakra")
+    report_parser.set_defaults(handler=report)
+
+    migrate_parser = commands.add_parser('migrate', help="JSONL naplók átvétele az adatbázisba")
+    migrate_parser.set_defaults(handler=migrate)
+
+    schema_parser = commands.add_parser('schema', help="séma verzió és a lefutott sémaváltozások")
+    schema_parser.set_defaults(handler=schema)
+
+    summary_parser = commands.add_parser('summary', help="havi vagy éves összesítés")
+    summary_target = summary_parser.add_mutually_exclusive_group(required=True)
+    summary_target.add_argument('--year', type=int, help="év, hónaponkénti bontásban")
+    summary_target.add_argument('--month', type=parseMonth, help="hónap (ÉÉÉÉ-HH), övezet és gyár szerint")
+    summary_parser.set_defaults(handler=summary)
+
+    analyze_parser = commands.add_parser('analyze', help="több éves elemzés övezet, gyár, cím vagy időszak szerint")
+    analyze_parser.add_argument('--from', dest='from_month', type=parseMonth, required=True, help="első hónap (ÉÉÉÉ-HH)")
+    analyze_parser.add_argument('--to', dest='to_month', type=parseMonth, required=True, help="utolsó hónap (ÉÉÉÉ-HH)")
+    analyze_parser.add_argument('--by', choices=GROUPS, default='month', help="csoportosítás (alapértelmezés: %(default)s)")
+    analyze_parser.add_argument('--zone', help="csak ez az övezet")
+    analyze_parser.add_argument('--factory', help="csak ez a gyár")
+    analyze_parser.set_defaults(handler=analyze)
+
+    rebuild_parser = commands.add_parser('rebuild', help="összesítő táblák újraszámolása a nyers adatokból")
+    rebuild_parser.set_defaults(handler=rebuild)
+
+    duplicates_parser = commands.add_parser('duplicates', help="ismétlődő szállítószámok keresése")
+    duplicates_parser.add_argument('--delete-exact', action='store_true',
+                                   help="a teljesen azonos ismétlések törlése, az első megtartásával")
+    duplicates_parser.set_defaults(handler=duplicates)
+    return parser
+
+
+def main(argv=None):
+    args = buildParser().parse_args(argv)
+    if getattr(args, 'from_month', None) and args.from_month > args.to_month:
+        print("A kezdő hónap nem lehet a záró hónap után", file=sys.stderr)
+        return 2
+    try:
+        args.handler(args)
+    finally:
+        closeRepository()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
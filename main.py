@@ -1,21 +1,34 @@
+from startup_timeline import timeline
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QFrame,
     QPushButton, QLabel, QLineEdit, QDateEdit, QTimeEdit,
-    QComboBox, QTableWidget, QTableWidgetItem, QHeaderView,
-    QApplication, QMenuBar, QMenu, QFileDialog, QMessageBox,
-    QDialog
+    QComboBox, QHeaderView,
+    QTableView,
+    QApplication, QMenuBar, QFileDialog, QMessageBox,
+    QDialog, QFormLayout, QDialogButtonBox, QCompleter
 )
-from PySide6.QtCore import Qt, QTime, QDate
-from PySide6.QtGui import QFont, QColor
-from PySide6.QtPrintSupport import QPrintDialog, QPrinter
-from PySide6.QtWidgets import QFormLayout, QTabWidget, QSpinBox
+from PySide6.QtCore import Qt, QDate, QTimer, QObject, Signal, QStringListModel, QThreadPool
+from PySide6.QtGui import QTextDocument, QShortcut, QKeySequence
+timeline.mark("PySide6 import")
 import sys
-import json
-import calendar
-import sqlite3
-from datetime import datetime, timedelta
-from openpyxl import Workbook, load_workbook
-from openpyxl.styles import PatternFill, Border, Side, Alignment, Font
+from datetime import date
+from repository import getRepository, closeRepository
+from write_queue import WriteQueue
+from month_models import MonthModels, MonthCache, fetchMonth
+from master_data import TABLES, getMasterData
+from address_index import AddressIndex
+from delivery_numbers import DeliveryNumberIndex
+from workers import Job, JobRunner
+from profiler import profiler, timed
+timeline.mark("alkalmazás modulok import")
+# Az openpyxl-t, a nyomtatást és a törzsadat kezelőt csak az első használatkor
+# töltjük be (timeline.lazyImport), így nem lassítják az indulást.
+
+# Mentések tartóssága: 'batch' (kötegenként), 'count' (WRITE_EVERY rekordonként)
+# vagy 'interval' (WRITE_INTERVAL másodpercenként)
+WRITE_POLICY = 'batch'
+WRITE_EVERY = 50
+WRITE_INTERVAL = 1.0
 
 class MenuBar(QMenuBar):
     def __init__(self, parent=None):
@@ -33,12 +46,76 @@ class MenuBar(QMenuBar):
     def createDatabaseMenu(self):
         dbMenu = self.addMenu("Adatbázis")
         dbMenu.addAction("Törzsadatok kezelése").triggered.connect(self.parent().openDatabaseManager)
+        search_action = dbMenu.addAction("Fuvarok keresése")
+        search_action.setShortcut("Ctrl+F")
+        search_action.triggered.connect(self.parent().openSearch)
+
+class DateRangeDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Időszak kiválasztása")
+        layout = QFormLayout()
+
+        today = QDate.currentDate()
+        self.from_edit = QDateEdit(QDate(today.year(), today.month(), 1))
+        self.from_edit.setCalendarPopup(True)
+        self.to_edit = QDateEdit(QDate(today.year(), today.month(), today.daysInMonth()))
+        self.to_edit.setCalendarPopup(True)
+        layout.addRow("Kezdő dátum:", self.from_edit)
+        layout.addRow("Záró dátum:", self.to_edit)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+        self.setLayout(layout)
+
+    def dateRange(self):
+        first_day = self.from_edit.date().toPython()
+        last_day = self.to_edit.date().toPython()
+        return min(first_day, last_day), max(first_day, last_day)
+
+class AddressCompleter(QCompleter):
+    # A javaslatokat az AddressIndex adja, a QCompleter nem szűr maga
+    def __init__(self, line_edit, index=None):
+        super().__init__(line_edit)
+        self.index = index or AddressIndex()
+        self.list_model = QStringListModel(self)
+        self.setModel(self.list_model)
+        self.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.setCaseSensitivity(Qt.CaseInsensitive)
+        self.setWidget(line_edit)
+        self.activated.connect(line_edit.setText)
+        line_edit.textEdited.connect(self.updateSuggestions)
+
+    def updateSuggestions(self, text):
+        suggestions = self.index.search(text)
+        self.list_model.setStringList(suggestions)
+        if suggestions:
+            self.complete()
+        else:
+            self.popup().hide()
+
+
+class MasterDataSignals(QObject):
+    # (tábla, régi sor vagy None, új sor vagy None)
+    changed = Signal(str, object, object)
+
+
+class WriteQueueSignals(QObject):
+    # A háttérszálból érkező jelzések a GUI szálra kerülnek
+    committed = Signal(int)
+    failed = Signal(str)
 
 class FuvarAdminApp(QMainWindow):
-    def __init__(self):
+    def __init__(self, startup_trace=None):
         super().__init__()
+        self.startup_trace = startup_trace
+        self.grids_built = False
         self.initDatabase()
+        timeline.mark("adatbázis")
         self.initUI()
+        timeline.mark("ablak felépítve")
 
     def initUI(self):
         self.setWindowTitle("Fuvar Adminisztráció")
@@ -53,46 +130,73 @@ class FuvarAdminApp(QMainWindow):
         self.setupBottomFrame(main_layout)
         self.setupButtons(main_layout)
         main_widget.setLayout(main_layout)
+
+        # Rejtett diagnosztika ablak a futásidő mérésekhez
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self, self.openDiagnostics)
+
+        # A táblázatok elkészültéig a mentés és a menü nem használható
+        self.menuBar().setEnabled(False)
+        self.button_frame.setEnabled(False)
         self.showMaximized()
 
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        # A táblázatokat az első kirajzolás után építjük fel
+        if not self.grids_built:
+            self.grids_built = True
+            timeline.mark("első kirajzolás")
+            QTimer.singleShot(0, self.buildGrids)
+
     def initDatabase(self):
-        self.conn = sqlite3.connect('fuvarok.db')
-        cursor = self.conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS factories (
-                id INTEGER PRIMARY KEY,
-                nev TEXT,
-                fuvardij INTEGER
-            )
-        ''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS addresses (
-                id INTEGER PRIMARY KEY,
-                cim TEXT,
-                ar INTEGER
-            )
-        ''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS zones (
-                id INTEGER PRIMARY KEY,
-                nev TEXT,
-                alapdij INTEGER
-            )
-        ''')
-        self.conn.commit()
-        
-        cursor.execute("SELECT COUNT(*) FROM factories")
-        count = cursor.fetchone()[0]
-        
-        if count == 0:
-            factories = [
-                ('CATL', 5000),
-                ('BMW', 6000),
-                ('Gyár 3', 5500)
-            ]
-            cursor.executemany("INSERT INTO factories (nev, fuvardij) VALUES (?, ?)", factories)
-            self.conn.commit()
+        # Közös adatelérési réteg: egyetlen kapcsolat, WAL mód
+        self.repository = getRepository()
+        for step in self.repository.applied_migrations:
+            timeline.detail(f"sémaváltozás {step['version']}: {step['name']}", step['ms'])
+
+        # A régi JSONL naplók egyszeri átvétele
+        self.repository.migrateJsonLogs()
+
+        # Törzsadatok memóriában, változáskor csak az érintett elemek frissülnek
+        self.master_data = getMasterData(self.repository)
+        self.master_signals = MasterDataSignals()
+        self.master_signals.changed.connect(self.onMasterDataChanged)
+        # A feliratkozó a closeEvent-ben iratkozik le
+        self.master_listener = self.master_signals.changed.emit
+        self.master_data.subscribe(self.master_listener)
+
+        # Km sávok a zones táblából, a fuvar táblázat oszlopai ezt követik
+        self.zones = self.master_data.zoneRegistry()
+
+        # Szállítószámok ismétlődésének ellenőrzése
+        self.delivery_numbers = DeliveryNumberIndex(self.repository)
+
+        # Import, export és nyomtatás háttérszálon
+        self.jobs = JobRunner(self)
+
+        # Mentések kötegelt írása háttérszálon
+        self.write_signals = WriteQueueSignals()
+        self.write_signals.committed.connect(self.onWritesCommitted)
+        self.write_signals.failed.connect(self.onWriteFailed)
+        self.write_queue = WriteQueue(
+            self.repository, policy=WRITE_POLICY, every=WRITE_EVERY, interval=WRITE_INTERVAL,
+            on_commit=self.write_signals.committed.emit,
+            on_error=self.write_signals.failed.emit
+        )
+
+    def onWritesCommitted(self, count):
+        self.statusBar().showMessage(f"{count} bejegyzés mentve", 3000)
+
+    def onWriteFailed(self, message):
+        QMessageBox.warning(self, "Hiba", f"Mentési hiba: {message}")
+
+    def closeEvent(self, event):
+        # Kilépés előtt leállítjuk a háttérfeladatokat és minden várakozó mentést kiírunk
+        self.jobs.cancelAll()
+        self.master_data.unsubscribe(self.master_listener)
+        if getattr(self, 'search_dialog', None) is not None:
+            self.search_dialog.close()
+        self.write_queue.close()
+        super().closeEvent(event)
 
     def setupStyles(self):
         self.styles = {
@@ -203,7 +307,11 @@ class FuvarAdminApp(QMainWindow):
         
         # Kilométer sáv
         self.km_combo = QComboBox()
-        self.km_combo.addItems([f"Övezet {i}-{i+5}" for i in range(0, 50, 5)])
+        self.km_combo.addItems(self.zones.labels)
+        # Távolság (km) is beírható, ebből a megfelelő sáv választódik ki
+        self.km_combo.setEditable(True)
+        self.km_combo.setInsertPolicy(QComboBox.NoInsert)
+        self.km_combo.lineEdit().editingFinished.connect(self.applyKmInput)
         self.km_combo.setFixedWidth(input_width)
         right_layout.addLayout(self.createInputGroup("Kilométer sáv:", self.km_combo))
         
@@ -216,10 +324,14 @@ class FuvarAdminApp(QMainWindow):
         # Cím és szállítószám
         self.address_input = QLineEdit()
         self.address_input.setFixedWidth(input_width)
+        # Az index a táblázatokkal együtt, az első kirajzolás után töltődik fel
+        self.address_completer = AddressCompleter(self.address_input)
         right_layout.addLayout(self.createInputGroup("Cím:", self.address_input))
         
         self.delivery_input = QLineEdit()
         self.delivery_input.setFixedWidth(input_width)
+        self.delivery_input.textEdited.connect(self.checkDeliveryNumber)
+        self.date_edit.dateChanged.connect(self.checkDeliveryNumber)
         right_layout.addLayout(self.createInputGroup("Szállítószám:", self.delivery_input))
         
         # M3 bevitel
@@ -248,90 +360,226 @@ class FuvarAdminApp(QMainWindow):
     def setupBottomFrame(self, main_layout):
         bottom_frame = QFrame()
         bottom_frame.setStyleSheet(self.styles['main_frame'])
-        button_layout = QHBoxLayout()
+        # A hónap választó és a táblázatok az első kirajzolás után kerülnek ide (buildGrids)
+        self.bottom_layout = QVBoxLayout()
+        self.grid_layout = QHBoxLayout()
+        self.bottom_layout.addLayout(self.grid_layout, 1)
+        bottom_frame.setLayout(self.bottom_layout)
+        main_layout.addWidget(bottom_frame, 1)
+
+    def buildGrids(self):
+        grid_layout = self.grid_layout
+
+        # Egyszerre egy hónap látszik, a felépített hónapok a gyorsítótárban maradnak
+        self.month_cache = MonthCache()
+        self.prefetch_jobs = {}
+        self.running_prefetches = set()
+        today = date.today()
+        self.current_month = self.monthModels(today.year, today.month)
+
+        self.setupMonthNavigation()
 
         # Munkaórák táblázat
         work_frame = QFrame()
         work_frame.setStyleSheet(self.styles['table_frame'])
         work_layout = QVBoxLayout()
 
-        # Munkaórák táblázat fejlécének beállítása
-        self.work_table = QTableWidget()
-        self.work_table.setColumnCount(7)
-        work_headers = ["Dátum", "Nap", "Munka KB", "Munka BF", 
-                       "Ledolgozott óra", "Műhely KB", "Műhely BF"]
-    
-        header = self.work_table.horizontalHeader()
-        header.setVisible(True)
-        header.setMinimumHeight(40)
-        for i, title in enumerate(work_headers):
-            item = QTableWidgetItem(title)
-            item.setTextAlignment(Qt.AlignCenter)
-            self.work_table.setHorizontalHeaderItem(i, item)
-            self.work_table.setColumnWidth(i, 150)
-    
-        # Fuvar táblázat fejlécének beállítása
-        self.delivery_table = QTableWidget()
-        self.delivery_table.setColumnCount(10)
-        delivery_headers = ["Dátum"] + [f"Övezet {i}-{i+5}" for i in range(0, 45, 5)] + ["Összeg"]
-    
-        header = self.delivery_table.horizontalHeader()
-        header.setVisible(True)
-        header.setMinimumHeight(40)
-        for i, title in enumerate(delivery_headers):
-            item = QTableWidgetItem(title)
-            item.setTextAlignment(Qt.AlignCenter)
-            self.delivery_table.setHorizontalHeaderItem(i, item)
-            self.delivery_table.setColumnWidth(i, 150)
-    
-        # Fejléc formázása
-        header = self.work_table.horizontalHeader()
-        header.setFixedHeight(35)  # Fejléc magasság
-        header.setDefaultAlignment(Qt.AlignCenter)  # Középre igazítás
-        header.setStyleSheet("""
-            QHeaderView::section {
-                background-color: #f0f0f0;
-                padding: 5px;
-                border: 1px solid black;
-                font-size: 14px;
-                font-weight: bold;
-            }
-        """)
-    
-        # Oszlopszélességek beállítása
-        for i in range(self.work_table.columnCount()):
-            self.work_table.setColumnWidth(i, 150)
+        self.work_table = self.createMonthView(self.current_month.work_model)
+
+        # A megjelenített hónap heti ledolgozott órái
+        self.week_total_label = QLabel()
+        self.week_total_label.setAlignment(Qt.AlignRight)
 
         work_layout.addWidget(self.work_table)
+        work_layout.addWidget(self.week_total_label)
         work_frame.setLayout(work_layout)
-        button_layout.addWidget(work_frame)
+        grid_layout.addWidget(work_frame)
 
         # Fuvar táblázat
         delivery_frame = QFrame()
         delivery_frame.setStyleSheet(self.styles['table_frame'])
         delivery_layout = QVBoxLayout()
 
-        self.delivery_table = QTableWidget()
-        self.delivery_table.setColumnCount(10)
-        delivery_headers = ["Dátum"] + [f"Övezet {i}-{i+5}" for i in range(0, 45, 5)] + ["Összeg"]
-    
-        header = self.delivery_table.horizontalHeader()
+        self.delivery_table = self.createMonthView(self.current_month.delivery_model)
+
+        # A megjelenített hónap fuvardíj összege
+        self.month_total_label = QLabel()
+        self.month_total_label.setAlignment(Qt.AlignRight)
+
+        delivery_layout.addWidget(self.delivery_table)
+        delivery_layout.addWidget(self.month_total_label)
+        delivery_frame.setLayout(delivery_layout)
+        grid_layout.addWidget(delivery_frame)
+
+        # Más hónapra eső dátum kiválasztásakor az a hónap jelenik meg
+        self.date_edit.dateChanged.connect(
+            lambda selected: self.showMonth(selected.year(), selected.month()))
+
+        self.showMonth(today.year, today.month)
+        self.setupTableStyles()
+        # A címek azonnal ajánlhatók, a használati számok (teljes GROUP BY a
+        # fuvarokon) háttérszálon érkeznek, addig betűrendben
+        self.address_completer.index = AddressIndex([row['cim'] for row in self.master_data.addresses()])
+        self.loadAddressUsage()
+        self.menuBar().setEnabled(True)
+        self.button_frame.setEnabled(True)
+        timeline.mark("táblázatok felépítve")
+        QTimer.singleShot(0, self.onInteractive)
+
+    def setupMonthNavigation(self):
+        nav_layout = QHBoxLayout()
+        prev_button = QPushButton("◀ Előző hónap")
+        prev_button.setShortcut("Ctrl+PgUp")
+        prev_button.clicked.connect(lambda: self.stepMonth(-1))
+        next_button = QPushButton("Következő hónap ▶")
+        next_button.setShortcut("Ctrl+PgDown")
+        next_button.clicked.connect(lambda: self.stepMonth(1))
+        today_button = QPushButton("Aktuális hónap")
+        today_button.clicked.connect(lambda: self.showMonth(date.today().year, date.today().month))
+
+        # Tetszőleges hónapra ugrás
+        self.month_edit = QDateEdit()
+        self.month_edit.setDisplayFormat("yyyy. MM.")
+        self.month_edit.setCalendarPopup(True)
+        self.month_edit.setDate(QDate.currentDate())
+        self.month_edit.dateChanged.connect(
+            lambda selected: self.showMonth(selected.year(), selected.month()))
+
+        for widget in [prev_button, self.month_edit, next_button, today_button]:
+            widget.setStyleSheet(self.styles['button'] if widget is not self.month_edit else self.styles['input'])
+            nav_layout.addWidget(widget)
+        nav_layout.addStretch()
+        self.bottom_layout.insertLayout(0, nav_layout)
+
+    def stepMonth(self, step):
+        index = self.current_month.year * 12 + self.current_month.month - 1 + step
+        self.showMonth(index // 12, index % 12 + 1)
+
+    @timed()
+    def monthModels(self, year, month):
+        # A gyorsítótárból, vagy azonnal felépítve az adatbázisból
+        models = self.month_cache.get((year, month))
+        if models is None:
+            self.cancelPrefetch((year, month))
+            self.write_queue.flush()
+            models = MonthModels(year, month, self.zones, self.master_data)
+            models.fill(*fetchMonth(self.repository, year, month))
+            self.month_cache.put((year, month), models)
+        return models
+
+    @timed()
+    def showMonth(self, year, month):
+        models = self.monthModels(year, month)
+        if models is self.current_month and getattr(self, 'work_model', None) is models.work_model:
+            return
+        self.current_month = models
+        self.work_model = self.current_month.work_model
+        self.delivery_model = self.current_month.delivery_model
+        for view, model in [(self.work_table, self.work_model), (self.delivery_table, self.delivery_model)]:
+            view.setModel(model)
+            for i in range(model.columnCount()):
+                view.setColumnWidth(i, 150)
+
+        self.month_edit.blockSignals(True)
+        self.month_edit.setDate(QDate(year, month, 1))
+        self.month_edit.blockSignals(False)
+        self.updateMonthTotal()
+        self.prefetchNeighbours()
+
+    def loadAddressUsage(self):
+        job = Job(self.runAddressUsage)
+        job.signals.finished.connect(self.onAddressUsage, Qt.QueuedConnection)
+        job.signals.failed.connect(self.onAddressUsageFailed, Qt.QueuedConnection)
+        job.setAutoDelete(False)
+        self.address_usage_job = job
+        QThreadPool.globalInstance().start(job)
+
+    @timed(rows=len)
+    def runAddressUsage(self, progress):
+        # Háttérszálon fut: a várakozó mentések után olvas
+        self.write_queue.flush()
+        return self.repository.addressUsage()
+
+    def onAddressUsage(self, usage):
+        # Az élő indexbe olvasztjuk, így a betöltés közbeni mentések sem vesznek el
+        self.address_usage_job = None
+        self.address_completer.index.merge(usage)
+
+    def onAddressUsageFailed(self, message):
+        self.address_usage_job = None
+        self.statusBar().showMessage(f"A címhasználat betöltése sikertelen: {message}", 5000)
+
+    def prefetchNeighbours(self):
+        # Az előző és a következő hónap háttérszálon olvasódik be
+        index = self.current_month.year * 12 + self.current_month.month - 1
+        for neighbour in [index - 1, index + 1]:
+            key = (neighbour // 12, neighbour % 12 + 1)
+            if key in self.month_cache or key in self.prefetch_jobs:
+                continue
+            job = Job(self.runFetchMonth, *key)
+            job.signals.finished.connect(
+                lambda rows, key=key, job=job: self.onMonthFetched(key, job, rows), Qt.QueuedConnection)
+            job.signals.failed.connect(
+                lambda message, key=key, job=job: self.onMonthFetched(key, job, None), Qt.QueuedConnection)
+            # A futó feladatra a befejezéséig hivatkozunk, akkor is, ha közben elavult
+            job.setAutoDelete(False)
+            self.prefetch_jobs[key] = job
+            self.running_prefetches.add(job)
+            QThreadPool.globalInstance().start(job)
+
+    @timed(rows=lambda rows: len(rows[0]) + len(rows[1]))
+    def runFetchMonth(self, year, month, progress):
+        # Háttérszálon fut: a várakozó mentések után olvas
+        self.write_queue.flush()
+        return fetchMonth(self.repository, year, month)
+
+    @timed()
+    def onMonthFetched(self, key, job, rows):
+        self.running_prefetches.discard(job)
+        # Közben érkezett mentésnél vagy újratöltésnél az eredmény elavult
+        if self.prefetch_jobs.get(key) is not job:
+            return
+        del self.prefetch_jobs[key]
+        if rows is not None and key not in self.month_cache:
+            models = MonthModels(key[0], key[1], self.zones, self.master_data)
+            models.fill(*rows)
+            self.month_cache.put(key, models)
+
+    def cachedMonth(self, date_text):
+        # Mentéskor: a dátum hónapjának modelljei, ha már fel vannak építve.
+        # A folyamatban lévő előtöltés eredménye ilyenkor már nem érvényes.
+        key = (int(date_text[:4]), int(date_text[5:7]))
+        self.cancelPrefetch(key)
+        return self.month_cache.peek(key)
+
+    def cancelPrefetch(self, key):
+        job = self.prefetch_jobs.pop(key, None)
+        if job:
+            job.cancel()
+
+    def applyZones(self):
+        # Övezet változás után új oszlopok, a hónapok újra felépülnek
+        zones = self.master_data.zoneRegistry()
+        if zones.headers == self.zones.headers:
+            self.zones = zones
+            return
+        self.zones = zones
+        current = self.km_combo.currentText()
+        self.km_combo.clear()
+        self.km_combo.addItems(zones.labels)
+        self.km_combo.setCurrentText(current)
+        self.reloadMonths(None)
+
+    def createMonthView(self, model):
+        view = QTableView()
+        view.setModel(model)
+
+        # Fejléc formázása
+        header = view.horizontalHeader()
         header.setVisible(True)
         header.setMinimumHeight(40)
-        for i, title in enumerate(delivery_headers):
-            item = QTableWidgetItem(title)
-            item.setTextAlignment(Qt.AlignCenter)
-            self.delivery_table.setHorizontalHeaderItem(i, item)
-            self.delivery_table.setColumnWidth(i, 150)
-    
-        # Fejlécek beállítása
-        delivery_headers = ["Dátum"] + [f"Övezet {i}-{i+5}" for i in range(0, 45, 5)] + ["Összeg"]
-        self.delivery_table.setHorizontalHeaderLabels(delivery_headers)
-    
-        # Fejléc formázása
-        header = self.delivery_table.horizontalHeader()
-        header.setFixedHeight(35)
-        header.setDefaultAlignment(Qt.AlignCenter)
+        header.setFixedHeight(35)  # Fejléc magasság
+        header.setDefaultAlignment(Qt.AlignCenter)  # Középre igazítás
         header.setStyleSheet("""
             QHeaderView::section {
                 background-color: #f0f0f0;
@@ -341,24 +589,19 @@ class FuvarAdminApp(QMainWindow):
                 font-weight: bold;
             }
         """)
-    
-        # Oszlopszélességek beállítása
-        for i in range(self.delivery_table.columnCount()):
-            self.delivery_table.setColumnWidth(i, 150)
-
-        delivery_layout.addWidget(self.delivery_table)
-        delivery_frame.setLayout(delivery_layout)
-        button_layout.addWidget(delivery_frame)
 
-        bottom_frame.setLayout(button_layout)
-        main_layout.addWidget(bottom_frame)
+        # Oszlopszélességek beállítása
+        for i in range(model.columnCount()):
+            view.setColumnWidth(i, 150)
 
-        self.setupTableRows()
-        self.setupTableStyles()
+        # Egységes sormagasság, így a nézet nem méri le egyenként a sorokat
+        view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        view.verticalHeader().setDefaultSectionSize(30)
+        return view
 
     def setupTableStyles(self):
         table_style = """
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 border: 2px solid #ff2800;
                 color: black;
@@ -375,7 +618,7 @@ class FuvarAdminApp(QMainWindow):
                 min-height: 35px;
                 font-family: Arial;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
                 min-height: 30px;
                 border-bottom: 1px solid #ddd;
@@ -387,32 +630,64 @@ class FuvarAdminApp(QMainWindow):
         self.work_table.setStyleSheet(table_style)
         self.delivery_table.setStyleSheet(table_style)
 
-    def setupTableRows(self):
-        current_date = QDate.currentDate()
-        first_day = QDate(current_date.year(), current_date.month(), 1)
-        days_in_month = first_day.daysInMonth()
-        
-        # Magyar napnevek
-        day_names = ['Hétfő', 'Kedd', 'Szerda', 'Csütörtök', 'Péntek', 'Szombat', 'Vasárnap']
-        
-        for table in [self.work_table, self.delivery_table]:
-            table.setRowCount(0)  # Töröljük a meglévő sorokat
-            
-            for i in range(days_in_month):
-                current_day = first_day.addDays(i)
-                table.insertRow(i)
-                
-                # Dátum beállítása
-                date_item = QTableWidgetItem(current_day.toString('yyyy-MM-dd'))
-                date_item.setTextAlignment(Qt.AlignCenter)
-                table.setItem(i, 0, date_item)
-                
-                if table == self.work_table:
-                    # Nap neve
-                    day_name = day_names[current_day.dayOfWeek() - 1]
-                    day_item = QTableWidgetItem(day_name)
-                    day_item.setTextAlignment(Qt.AlignCenter)
-                    table.setItem(i, 1, day_item)
+    def onInteractive(self):
+        timeline.mark("interaktív")
+        if self.startup_trace:
+            timeline.save(self.startup_trace)
+            print(timeline.summary(), file=sys.stderr)
+
+    def updateMonthTotal(self):
+        if not hasattr(self, 'month_total_label'):
+            return
+        month = f"{self.current_month.year}-{self.current_month.month:02d}"
+        self.month_total_label.setText(f"Havi összeg ({month}): {self.current_month.total():,.0f} Ft")
+        self.week_total_label.setText("   ".join(
+            f"{label}: {hours:.2f} óra" for label, hours in self.current_month.weekTotals()))
+
+    @timed()
+    def reloadMonths(self, dates):
+        # Az érintett hónapok (None esetén az összes) kikerülnek a gyorsítótárból,
+        # a megjelenített hónap azonnal újra felépül
+        if dates is None:
+            self.month_cache.clear()
+            for key in list(self.prefetch_jobs):
+                self.cancelPrefetch(key)
+        else:
+            for key in {(int(d[:4]), int(d[5:7])) for d in dates}:
+                self.month_cache.discard(key)
+                self.cancelPrefetch(key)
+        self.showMonth(self.current_month.year, self.current_month.month)
+
+    @timed()
+    def onMasterDataChanged(self, table, old_row, new_row):
+        key_column = TABLES[table][0]
+        kind = {'factories': 'factory', 'addresses': 'address', 'zones': 'zone'}[table]
+        if table == 'zones':
+            # Új vagy törölt övezetnél az oszlopok is változhatnak
+            self.applyZones()
+
+        for row in [old_row, new_row]:
+            if row is None:
+                continue
+            key = row[key_column]
+            exists = self.master_data.hasKey(table, key)
+            if table == 'factories':
+                index = self.factory_combo.findText(key)
+                if exists and index < 0:
+                    self.factory_combo.addItem(key)
+                elif not exists and index >= 0:
+                    self.factory_combo.removeItem(index)
+            elif table == 'addresses':
+                if exists:
+                    self.address_completer.index.use(key, count=0)
+                else:
+                    self.address_completer.index.remove(key)
+            # A gyorsítótárban lévő hónapokban csak az érintett napok számolódnak újra
+            rate = self.master_data.rate(table, key)
+            for models in self.month_cache.values():
+                models.setRate(kind, key, rate)
+
+        self.updateMonthTotal()
 
     def createInputGroup(self, label_text, widget):
         layout = QHBoxLayout()
@@ -425,7 +700,7 @@ class FuvarAdminApp(QMainWindow):
         return layout
 
     def setupButtons(self, main_layout):
-        button_frame = QFrame()
+        button_frame = self.button_frame = QFrame()
         button_layout = QHBoxLayout()
         
         buttons = [
@@ -446,10 +721,7 @@ class FuvarAdminApp(QMainWindow):
 
     def loadFactories(self):
         self.factory_combo.clear()
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT nev FROM factories")
-        factories = cursor.fetchall()
-        self.factory_combo.addItems([factory[0] for factory in factories])
+        self.factory_combo.addItems(self.master_data.factoryNames())
 
     def handleM3Input(self):
         text = self.m3_input.text().strip()
@@ -485,19 +757,41 @@ class FuvarAdminApp(QMainWindow):
         zone_text = self.km_combo.currentText()
         zone_col = self.getZoneColumn(zone_text)
         
-        if zone_col > 0:
-            for row in range(self.delivery_table.rowCount()):
-                if self.delivery_table.item(row, 0).text() == date_text:
-                    self.delivery_table.setItem(row, zone_col, QTableWidgetItem(sum_text))
+        row = self.delivery_model.rowForDate(date_text)
+        if zone_col > 0 and row >= 0:
+            # Csak előnézet, az összeg mentéskor kerül a cellába
+            self.delivery_model.setPreview(row, zone_col, sum_text)
+
+    def duplicateDates(self):
+        date_text = self.date_edit.date().toString('yyyy-MM-dd')
+        return self.delivery_numbers.dates(date_text, self.delivery_input.text())
+
+    def checkDeliveryNumber(self):
+        # Már rögzített szállítószámnál a mező piros keretet kap
+        dates = self.duplicateDates()
+        if dates:
+            self.delivery_input.setStyleSheet("QLineEdit { border: 2px solid #ff2800; }")
+            self.delivery_input.setToolTip(f"Már rögzítve: {', '.join(sorted(set(dates)))}")
+        else:
+            self.delivery_input.setStyleSheet("")
+            self.delivery_input.setToolTip("")
 
     def getZoneColumn(self, zone_text):
-        try:
-            start_km = int(zone_text.split(' ')[1].split('-')[0])
-            column = (start_km // 5) + 1
-            return column
-        except:
-            return 0
+        return self.zones.column(zone_text)
 
+    def applyKmInput(self):
+        text = self.km_combo.currentText().strip().replace(',', '.')
+        try:
+            km = float(text)
+        except ValueError:
+            return
+        label = self.zones.zoneForKm(km)
+        if label:
+            self.km_combo.setCurrentText(label)
+        else:
+            self.statusBar().showMessage(f"Nincs övezet {text} km-hez", 3000)
+
+    @timed()
     def saveWorkHours(self):
         try:
             data = {
@@ -507,432 +801,212 @@ class FuvarAdminApp(QMainWindow):
                 'type': self.type_combo.currentText()
             }
         
-            # Táblázat frissítése
-            date_text = data['date']
-            start_text = data['start_time']
-            end_text = data['end_time']
-        
-            # Táblázat frissítése
-            for row in range(self.work_table.rowCount()):
-                if self.work_table.item(row, 0).text() == date_text:
-                    self.work_table.setItem(row, 2, QTableWidgetItem(start_text))
-                    self.work_table.setItem(row, 3, QTableWidgetItem(end_text))
-                    
-                    # Ledolgozott órák számítása
-                    start = datetime.strptime(start_text, '%H:%M')
-                    end = datetime.strptime(end_text, '%H:%M')
-                    hours = (end - start).seconds / 3600
-                    self.work_table.setItem(row, 4, QTableWidgetItem(f"{hours:.2f}"))
-
-            # Adatok mentése JSON fájlba
-            with open('work_hours.json', 'a', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False)
-                f.write('\n')
-            
-            QMessageBox.information(self, "Siker", "Munkaórák mentve!")
+            # Táblázat és összesítések frissítése, ha a hónap be van töltve
+            models = self.cachedMonth(data['date'])
+            if models:
+                models.setWorkDay(data)
+                if models is self.current_month:
+                    self.updateMonthTotal()
+
+            # Adatok mentése az adatbázisba, a háttérszál kötegelve írja ki
+            self.write_queue.put('work_hours', data)
+            self.statusBar().showMessage("Munkaórák mentése...", 3000)
         except Exception as e:
             QMessageBox.warning(self, "Hiba", f"Hiba történt: {str(e)}")
 
+    @timed()
     def saveDeliveryData(self):
         try:
+            # A begépelt km érték övezetre vált; ismeretlen övezettel nem mentünk,
+            # mert az nem jelenne meg a táblázatban, az összesítőkben viszont igen
+            self.applyKmInput()
+            zone_text = self.km_combo.currentText()
+            if self.getZoneColumn(zone_text) == 0:
+                QMessageBox.warning(self, "Hiba", f"Nincs ilyen kilométer sáv: {zone_text or '(üres)'}")
+                return
+
             data = {
                 'date': self.date_edit.date().toString('yyyy-MM-dd'),
-                'km_range': self.km_combo.currentText(),
+                'km_range': zone_text,
                 'factory': self.factory_combo.currentText(),
                 'address': self.address_input.text(),
-                'delivery_number': self.delivery_input.text(),
+                'delivery_number': self.delivery_input.text().strip(),
                 'm3_values': self.m3_values if hasattr(self, 'm3_values') else []
             }
-        
-            # Táblázat frissítése
-            date_text = data['date']
-            km_range = data['km_range']
-            m3_values = data['m3_values']
-        
-            # Övezet oszlop meghatározása
-            zone_col = self.getZoneColumn(km_range)
-        
-            if zone_col > 0:
-                for row in range(self.delivery_table.rowCount()):
-                    if self.delivery_table.item(row, 0).text() == date_text:
-                        # M3 értékek összege
-                        m3_sum = sum(m3_values) if m3_values else 0
-                    
-                        # Meglévő érték ellenőrzése
-                        current_item = self.delivery_table.item(row, zone_col)
-                        current_value = float(current_item.text()) if current_item and current_item.text() else 0
-                    
-                        # Új érték beállítása
-                        new_value = current_value + m3_sum
-                        self.delivery_table.setItem(row, zone_col, QTableWidgetItem(f"{new_value:.1f}"))
-
-            # Adatok mentése JSON fájlba
-            with open('delivery_data.json', 'a', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False)
-                f.write('\n')
+
+            dates = self.duplicateDates()
+            if dates:
+                answer = QMessageBox.question(
+                    self, "Ismétlődő szállítószám",
+                    f"A(z) {data['delivery_number']} szállítószám már szerepel: "
+                    f"{', '.join(sorted(set(dates)))}. Mégis menti?"
+                )
+                if answer != QMessageBox.Yes:
+                    return
+        
+            # Táblázat frissítése és az új fuvar árazása, ha a hónap be van töltve
+            models = self.cachedMonth(data['date'])
+            if models:
+                models.addDelivery(data)
+                self.updateMonthTotal()
+
+            # Adatok mentése az adatbázisba, a háttérszál kötegelve írja ki
+            self.write_queue.put('deliveries', data)
+            self.address_completer.index.use(data['address'])
+            self.delivery_numbers.add(data['date'], data['delivery_number'])
+            self.checkDeliveryNumber()
         
             # M3 értékek törlése a következő bevitelhez
             self.m3_values = []
             self.m3_input.clear()
             self.m3_sum.setText("(0)")
         
-            QMessageBox.information(self, "Siker", "Fuvar adatok mentve!")
+            self.statusBar().showMessage("Fuvar adatok mentése...", 3000)
         except Exception as e:
             QMessageBox.warning(self, "Hiba", f"Hiba történt: {str(e)}")
 
     def exportToExcel(self):
-        try:
-            wb = Workbook()
-            ws1 = wb.active
-            ws1.title = "Munkaórák"
-            
-            # Fejlécek
-            headers = ["Dátum", "Nap", "Kezdés", "Végzés", "Munka típusa"]
-            for col, header in enumerate(headers, 1):
-                cell = ws1.cell(row=1, column=col)
-                cell.value = header
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
-            
-            # Adatok mentése
-            for row in range(self.work_table.rowCount()):
-                for col in range(len(headers)):
-                    item = self.work_table.item(row, col)
-                    if item:
-                        ws1.cell(row=row+2, column=col+1, value=item.text())
-            
-            wb.save('munka_nyilvantartas.xlsx')
-            QMessageBox.information(self, "Siker", "Excel fájl mentve!")
-        except Exception as e:
-            QMessageBox.warning(self, "Hiba", f"Mentési hiba: {str(e)}")
-
+        # Tetszőleges időszak exportálása, akár több hónap vagy év
+        dialog = DateRangeDialog(self)
+        if dialog.exec() != QDialog.Accepted:
+            return
+        first_day, last_day = dialog.dateRange()
+        file_name, _ = QFileDialog.getSaveFileName(
+            self, "Excel exportálás", f"fuvar_{first_day}_{last_day}.xlsx", "Excel files (*.xlsx)"
+        )
+        if file_name:
+            self.exportRangeToExcel(first_day, last_day, file_name)
+
+    @timed()
     def saveToExcel(self):
-        try:
-            wb = Workbook()
-        
-            # Munkaórák munkalap
-            ws1 = wb.active
-            ws1.title = "Munkaórák"
-            work_headers = ["Dátum", "Nap", "Munka KB", "Munka BF", 
-                           "Ledolgozott óra", "Műhely KB", "Műhely BF"]
-        
-            # Fejlécek formázása az első munkalapon
-            for col, header in enumerate(work_headers, 1):
-                cell = ws1.cell(row=1, column=col)
-                cell.value = header
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
-            
-            # Munkaóra adatok mentése
-            for row in range(self.work_table.rowCount()):
-                for col in range(len(work_headers)):
-                    item = self.work_table.item(row, col)
-                    if item:
-                        ws1.cell(row=row+2, column=col+1, value=item.text())
-        
-            # Fuvar adatok munkalap
-            ws2 = wb.create_sheet(title="Fuvar adatok")
-            delivery_headers = ["Dátum"] + [f"Övezet {i}-{i+5}" for i in range(0, 45, 5)] + ["Összeg"]
-        
-            # Fejlécek formázása a második munkalapon
-            for col, header in enumerate(delivery_headers, 1):
-                cell = ws2.cell(row=1, column=col)
-                cell.value = header
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
-            
-            # Fuvar adatok mentése
-            for row in range(self.delivery_table.rowCount()):
-                for col in range(len(delivery_headers)):
-                    item = self.delivery_table.item(row, col)
-                    if item:
-                        ws2.cell(row=row+2, column=col+1, value=item.text())
-        
-            # Excel fájl mentése
-            wb.save('munka_nyilvantartas.xlsx')
-            QMessageBox.information(self, "Siker", "Excel fájl mentve!")
-        except Exception as e:
-            QMessageBox.warning(self, "Hiba", f"Mentési hiba: {str(e)}")
+        # A táblázatokban látható időszak mentése
+        days = self.work_model.days
+        self.exportRangeToExcel(days[0], days[-1], 'munka_nyilvantartas.xlsx')
+
+    def exportRangeToExcel(self, first_day, last_day, file_name):
+        self.jobs.start(
+            "Excel exportálás", Job(self.runExport, first_day, last_day, file_name),
+            lambda rows: QMessageBox.information(self, "Siker", "Excel fájl mentve!"),
+            lambda message: QMessageBox.warning(self, "Hiba", f"Mentési hiba: {message}")
+        )
+
+    @timed(rows=int)
+    def runExport(self, first_day, last_day, file_name, progress):
+        # Háttérszálon fut, widgetekhez nem nyúlhat.
+        # A várakozó mentéseknek is benne kell lenniük az exportban.
+        self.write_queue.flush()
+        exportRange = timeline.lazyImport('excel_export').exportRange
+        return exportRange(self.repository, first_day, last_day, file_name, progress)
 
     def openDatabaseManager(self):
+        DatabaseManager = timeline.lazyImport('database_manager').DatabaseManager
         dbManager = DatabaseManager(self)
         dbManager.exec_()
 
+    def openSearch(self):
+        # Nem modális, a találatok között lépkedve a táblázatok követik
+        if getattr(self, 'search_dialog', None) is None:
+            DeliverySearchDialog = timeline.lazyImport('search_dialog').DeliverySearchDialog
+            self.search_dialog = DeliverySearchDialog(self)
+        self.search_dialog.show()
+        self.search_dialog.raise_()
+        self.search_dialog.search_input.setFocus()
+
+    def jumpToDate(self, date_text):
+        # A nap hónapja jelenik meg, a nap sora kijelölve és látható
+        self.showMonth(int(date_text[:4]), int(date_text[5:7]))
+        for view, model in [(self.work_table, self.work_model), (self.delivery_table, self.delivery_model)]:
+            row = model.rowForDate(date_text)
+            if row >= 0:
+                view.selectRow(row)
+                view.scrollTo(model.index(row, 0), QTableView.PositionAtCenter)
+
+    def openDiagnostics(self):
+        # Nem modális, mérés közben is nyitva maradhat
+        if getattr(self, 'diagnostics_dialog', None) is None:
+            DiagnosticsDialog = timeline.lazyImport('diagnostics_dialog').DiagnosticsDialog
+            self.diagnostics_dialog = DiagnosticsDialog(profiler, self)
+        self.diagnostics_dialog.refresh()
+        self.diagnostics_dialog.show()
+        self.diagnostics_dialog.raise_()
+
     def openExcel(self):
         try:
             file_name, _ = QFileDialog.getOpenFileName(
-                self, "Excel fájl megnyitása", "", "Excel files (*.xlsx *.xls)"
+                self, "Excel fájl megnyitása", "", "Excel files (*.xlsx)"
             )
             if file_name:
-                wb = load_workbook(file_name)
-                self.loadDataFromExcel(wb)
+                self.loadDataFromExcel(file_name)
         except Exception as e:
             QMessageBox.warning(self, "Hiba", f"Fájl megnyitási hiba: {str(e)}")
 
-    def loadDataFromExcel(self, workbook):
-        try:
-            # Munkaórák betöltése
-            if "Munkaórák" in workbook.sheetnames:
-                ws = workbook["Munkaórák"]
-                for row in range(2, ws.max_row + 1):
-                    date = ws.cell(row=row, column=1).value
-                    if date:
-                        self.loadWorkHoursRow(date, ws, row)
-            
-            # Fuvar adatok betöltése
-            if "Fuvar adatok" in workbook.sheetnames:
-                ws = workbook["Fuvar adatok"]
-                for row in range(2, ws.max_row + 1):
-                    date = ws.cell(row=row, column=1).value
-                    if date:
-                        self.loadDeliveryRow(date, ws, row)
-                        
-            QMessageBox.information(self, "Siker", "Excel adatok betöltve!")
-        except Exception as e:
-            QMessageBox.warning(self, "Hiba", f"Adatok betöltési hiba: {str(e)}")
-
-    def loadWorkHoursRow(self, date, ws, row):
-        start_time = ws.cell(row=row, column=2).value
-        end_time = ws.cell(row=row, column=3).value
-        work_type = ws.cell(row=row, column=4).value
-        
-        for table_row in range(self.work_table.rowCount()):
-            if self.work_table.item(table_row, 0).text() == str(date):
-                if start_time:
-                    self.work_table.setItem(table_row, 2, QTableWidgetItem(str(start_time)))
-                if end_time:
-                    self.work_table.setItem(table_row, 3, QTableWidgetItem(str(end_time)))
-                if work_type:
-                    self.work_table.setItem(table_row, 4, QTableWidgetItem(str(work_type)))
-
-    def loadDeliveryRow(self, date, ws, row):
-        for col in range(1, self.delivery_table.columnCount()):
-            value = ws.cell(row=row, column=col+1).value
-            if value is not None:
-                for table_row in range(self.delivery_table.rowCount()):
-                    if self.delivery_table.item(table_row, 0).text() == str(date):
-                        self.delivery_table.setItem(table_row, col, QTableWidgetItem(str(value)))
+    def loadDataFromExcel(self, file_name):
+        self.jobs.start(
+            "Excel betöltés", Job(self.runImport, file_name),
+            self.onImportFinished,
+            lambda message: QMessageBox.warning(self, "Hiba", f"Adatok betöltési hiba: {message}")
+        )
+
+    @timed(rows=lambda result: result['rows'])
+    def runImport(self, file_name, progress):
+        # A várakozó mentések után importálunk, hogy a napok kihagyása helyes legyen
+        self.write_queue.flush()
+        importWorkbook = timeline.lazyImport('excel_import').importWorkbook
+        return importWorkbook(self.repository, file_name, progress)
+
+    @timed()
+    def onImportFinished(self, result):
+        # A widgetek frissítése csak a végén, hónaponként egy modell frissítéssel
+        self.reloadMonths(result['dates'])
+        self.delivery_numbers.invalidate()
+        message = f"Excel adatok betöltve: {result['rows']} sor ({result['rows_per_second']:.0f} sor/s)"
+        if result['skipped_rows']:
+            message += (f"\n{result['skipped_days']} már tárolt nap kihagyva "
+                        f"({result['skipped_rows']} sor nem lett betöltve)")
+        QMessageBox.information(self, "Siker", message)
 
     def printData(self):
+        QPrintDialog = timeline.lazyImport('PySide6.QtPrintSupport').QPrintDialog
         dialog = QPrintDialog(self)
         if dialog.exec_() == QDialog.Accepted:
             printer = dialog.printer()
-            # TODO: Nyomtatási logika implementálása
-
-class DatabaseManager(QDialog):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.conn = sqlite3.connect('fuvarok.db')
-        self.initUI()
-
-    def initUI(self):
-        self.setWindowTitle("Törzsadat Kezelő")
-        self.setMinimumWidth(800)
-        self.setMinimumHeight(600)
-        
-        layout = QVBoxLayout()
-        
-        # Tab widget létrehozása
-        tabs = QTabWidget()
-        tabs.addTab(self.createFactoriesTab(), "Gyárak")
-        tabs.addTab(self.createAddressesTab(), "Címek")
-        tabs.addTab(self.createZonesTab(), "Övezetek")
-        layout.addWidget(tabs)
-        
-        self.setLayout(layout)
-
-    def createFactoriesTab(self):
-        widget = QWidget()
-        layout = QVBoxLayout()
-        
-        # Adatbeviteli mezők
-        form_layout = QFormLayout()
-        self.factory_name = QLineEdit()
-        self.factory_price = QSpinBox()
-        self.factory_price.setRange(0, 1000000)
-        form_layout.addRow("Gyár neve:", self.factory_name)
-        form_layout.addRow("Fuvardíj:", self.factory_price)
-        
-        # Gombok
-        btn_layout = QHBoxLayout()
-        add_btn = QPushButton("Hozzáadás")
-        add_btn.clicked.connect(self.addFactory)
-        delete_btn = QPushButton("Törlés")
-        delete_btn.clicked.connect(self.deleteFactory)
-        btn_layout.addWidget(add_btn)
-        btn_layout.addWidget(delete_btn)
-        
-        # Táblázat
-        self.factory_table = QTableWidget()
-        self.factory_table.setColumnCount(3)
-        self.factory_table.setHorizontalHeaderLabels(["ID", "Név", "Fuvardíj"])
-        
-        layout.addLayout(form_layout)
-        layout.addLayout(btn_layout)
-        layout.addWidget(self.factory_table)
-        widget.setLayout(layout)
-        
-        self.loadFactories()
-        return widget
-
-    def createAddressesTab(self):
-        widget = QWidget()
-        layout = QVBoxLayout()
-        
-        form_layout = QFormLayout()
-        self.address = QLineEdit()
-        self.address_price = QSpinBox()
-        self.address_price.setRange(0, 1000000)
-        form_layout.addRow("Cím:", self.address)
-        form_layout.addRow("Egyedi ár:", self.address_price)
-        
-        btn_layout = QHBoxLayout()
-        add_btn = QPushButton("Hozzáadás")
-        add_btn.clicked.connect(self.addAddress)
-        delete_btn = QPushButton("Törlés")
-        delete_btn.clicked.connect(self.deleteAddress)
-        btn_layout.addWidget(add_btn)
-        btn_layout.addWidget(delete_btn)
-        
-        self.address_table = QTableWidget()
-        self.address_table.setColumnCount(3)
-        self.address_table.setHorizontalHeaderLabels(["ID", "Cím", "Ár"])
-        
-        layout.addLayout(form_layout)
-        layout.addLayout(btn_layout)
-        layout.addWidget(self.address_table)
-        widget.setLayout(layout)
-        
-        self.loadAddresses()
-        return widget
-
-    def createZonesTab(self):
-        widget = QWidget()
-        layout = QVBoxLayout()
-        
-        form_layout = QFormLayout()
-        self.zone_name = QLineEdit()
-        self.zone_price = QSpinBox()
-        self.zone_price.setRange(0, 1000000)
-        form_layout.addRow("Övezet:", self.zone_name)
-        form_layout.addRow("Alapdíj:", self.zone_price)
-        
-        btn_layout = QHBoxLayout()
-        add_btn = QPushButton("Hozzáadás")
-        add_btn.clicked.connect(self.addZone)
-        delete_btn = QPushButton("Törlés")
-        delete_btn.clicked.connect(self.deleteZone)
-        btn_layout.addWidget(add_btn)
-        btn_layout.addWidget(delete_btn)
-        
-        self.zone_table = QTableWidget()
-        self.zone_table.setColumnCount(3)
-        self.zone_table.setHorizontalHeaderLabels(["ID", "Név", "Alapdíj"])
-        
-        layout.addLayout(form_layout)
-        layout.addLayout(btn_layout)
-        layout.addWidget(self.zone_table)
-        widget.setLayout(layout)
-        
-        self.loadZones()
-        return widget
+            days = self.work_model.days
+            self.jobs.start(
+                "Nyomtatás", Job(self.runPrintReport, days[0], days[-1]),
+                lambda html: self.printHtml(printer, html),
+                lambda message: QMessageBox.warning(self, "Hiba", f"Nyomtatási hiba: {message}")
+            )
 
-    def loadFactories(self):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM factories")
-        self.factory_table.setRowCount(0)
-        for row, data in enumerate(cursor.fetchall()):
-            self.factory_table.insertRow(row)
-            for col, item in enumerate(data):
-                self.factory_table.setItem(row, col, QTableWidgetItem(str(item)))
-
-    def loadAddresses(self):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM addresses")
-        self.address_table.setRowCount(0)
-        for row, data in enumerate(cursor.fetchall()):
-            self.address_table.insertRow(row)
-            for col, item in enumerate(data):
-                self.address_table.setItem(row, col, QTableWidgetItem(str(item)))
-
-    def loadZones(self):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM zones")
-        self.zone_table.setRowCount(0)
-        for row, data in enumerate(cursor.fetchall()):
-            self.zone_table.insertRow(row)
-            for col, item in enumerate(data):
-                self.zone_table.setItem(row, col, QTableWidgetItem(str(item)))
-
-    def addFactory(self):
-        name = self.factory_name.text()
-        price = self.factory_price.value()
-        if name and price:
-            cursor = self.conn.cursor()
-            cursor.execute("INSERT INTO factories (nev, fuvardij) VALUES (?, ?)", (name, price))
-            self.conn.commit()
-            self.loadFactories()
-            self.factory_name.clear()
-            self.factory_price.setValue(0)
-
-    def addAddress(self):
-        address = self.address.text()
-        price = self.address_price.value()
-        if address and price:
-            cursor = self.conn.cursor()
-            cursor.execute("INSERT INTO addresses (cim, ar) VALUES (?, ?)", (address, price))
-            self.conn.commit()
-            self.loadAddresses()
-            self.address.clear()
-            self.address_price.setValue(0)
-
-    def addZone(self):
-        name = self.zone_name.text()
-        price = self.zone_price.value()
-        if name and price:
-            cursor = self.conn.cursor()
-            cursor.execute("INSERT INTO zones (nev, alapdij) VALUES (?, ?)", (name, price))
-            self.conn.commit()
-            self.loadZones()
-            self.zone_name.clear()
-            self.zone_price.setValue(0)
-
-    def deleteFactory(self):
-        selected = self.factory_table.selectedItems()
-        if selected:
-            row = selected[0].row()
-            id_item = self.factory_table.item(row, 0)
-            if id_item:
-                cursor = self.conn.cursor()
-                cursor.execute("DELETE FROM factories WHERE id=?", (id_item.text(),))
-                self.conn.commit()
-                self.loadFactories()
-
-    def deleteAddress(self):
-        selected = self.address_table.selectedItems()
-        if selected:
-            row = selected[0].row()
-            id_item = self.address_table.item(row, 0)
-            if id_item:
-                cursor = self.conn.cursor()
-                cursor.execute("DELETE FROM addresses WHERE id=?", (id_item.text(),))
-                self.conn.commit()
-                self.loadAddresses()
-
-    def deleteZone(self):
-        selected = self.zone_table.selectedItems()
-        if selected:
-            row = selected[0].row()
-            id_item = self.zone_table.item(row, 0)
-            if id_item:
-                cursor = self.conn.cursor()
-                cursor.execute("DELETE FROM zones WHERE id=?", (id_item.text(),))
-                self.conn.commit()
-                self.loadZones()
+    @timed()
+    def runPrintReport(self, first_day, last_day, progress):
+        self.write_queue.flush()
+        reportHtml = timeline.lazyImport('print_report').reportHtml
+        return reportHtml(self.repository, first_day, last_day, progress)
 
+    @timed()
+    def printHtml(self, printer, html):
+        # A nyomtatás a GUI szálon történik, a dokumentum már elkészült
+        document = QTextDocument()
+        document.setHtml(html)
+        document.print_(printer)
 
 if __name__ == "__main__":
+    # --startup-trace [fájl]: az indítási idővonal mentése JSON-ba
+    startup_trace = None
+    if "--startup-trace" in sys.argv:
+        index = sys.argv.index("--startup-trace") + 1
+        # A következő kapcsoló nem fájlnév
+        if index < len(sys.argv) and not sys.argv[index].startswith("-"):
+            startup_trace = sys.argv[index]
+        else:
+            startup_trace = "startup_trace.json"
+    # --profile: futásidő mérés bekapcsolva (Ctrl+Shift+D-vel is kapcsolható)
+    if "--profile" in sys.argv:
+        profiler.setEnabled(True)
     app = QApplication(sys.argv)
-    window = FuvarAdminApp()
+    timeline.mark("QApplication")
+    window = FuvarAdminApp(startup_trace)
     window.show()
-    sys.exit(app.exec())  # Eltávolítottuk az aláhúzást
\ No newline at end of file
+    exit_code = app.exec()  # Eltávolítottuk az aláhúzást
+    closeRepository()
+    sys.exit(exit_code)
\ No newline at end of file
@@ -0,0 +1,121 @@
+from zones import ZoneRegistry
+
+# Törzsadat táblák: tábla -> (kulcs oszlop, ár oszlop)
+TABLES = {
+    'factories': ('nev', 'fuvardij'),
+    'addresses': ('cim', 'ar'),
+    'zones': ('nev', 'alapdij'),
+}
+
+
+class MasterData:
+    # A gyárak, címek és övezetek memóriában, táblánként egyszer beolvasva.
+    # Minden módosítás ezen keresztül megy az adatbázisba, közben nő a verzió
+    # és a feliratkozók megkapják a változott sort: (tábla, régi sor, új sor).
+    def __init__(self, repository):
+        self.repository = repository
+        self.rows = {
+            'factories': {row['id']: row for row in repository.factories()},
+            'addresses': {row['id']: row for row in repository.addresses()},
+            'zones': {row['id']: row for row in repository.zones()},
+        }
+        # Név -> sor táblánként; a nevek egyediek (1. migráció), azonos névnél a
+        # legutóbb felvett sor marad, mint a díjszámításnál
+        self.keys = {
+            table: {row[key_column]: row for _, row in sorted(self.rows[table].items())}
+            for table, (key_column, _) in TABLES.items()
+        }
+        self.version = 0
+        self.versions = dict.fromkeys(TABLES, 0)
+        self.listeners = []
+        self.zone_registry = None
+        self.zone_registry_version = None
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def changed(self, table, old_row, new_row):
+        self.version += 1
+        self.versions[table] += 1
+        for listener in list(self.listeners):
+            listener(table, old_row, new_row)
+
+    # Olvasás memóriából
+    def factories(self):
+        return list(self.rows['factories'].values())
+
+    def addresses(self):
+        return list(self.rows['addresses'].values())
+
+    def zones(self):
+        return list(self.rows['zones'].values())
+
+    def factoryNames(self):
+        return [row['nev'] for row in self.factories()]
+
+    def rate(self, table, key):
+        row = self.keys[table].get(key)
+        return row[TABLES[table][1]] if row else None
+
+    def hasKey(self, table, key):
+        return key in self.keys[table]
+
+    def zoneRegistry(self):
+        # Csak övezet változás után épül újra
+        if self.zone_registry_version != self.versions['zones']:
+            self.zone_registry = ZoneRegistry(self.zones())
+            self.zone_registry_version = self.versions['zones']
+        return self.zone_registry
+
+    # Módosítás: adatbázis, memória, értesítés
+    def add(self, table, key, price):
+        key_column, price_column = TABLES[table]
+        if table == 'factories':
+            row_id = self.repository.addFactory(key, price)
+        elif table == 'addresses':
+            row_id = self.repository.addAddress(key, price)
+        else:
+            row_id = self.repository.addZone(key, price)
+        # Meglévő névnél az adatbázis csak az árat frissíti, a sor azonosítója marad
+        old_row = self.rows[table].get(row_id)
+        row = {'id': row_id, key_column: key, price_column: price}
+        self.rows[table][row_id] = row
+        if old_row is not None:
+            self.forgetKey(table, old_row)
+        self.keys[table][key] = row
+        self.changed(table, old_row, row)
+        return row
+
+    def delete(self, table, row_id):
+        row = self.rows[table].get(row_id)
+        if table == 'factories':
+            self.repository.deleteFactory(row_id)
+        elif table == 'addresses':
+            self.repository.deleteAddress(row_id)
+        else:
+            self.repository.deleteZone(row_id)
+        if row is not None:
+            del self.rows[table][row_id]
+            self.forgetKey(table, row)
+            self.changed(table, row, None)
+
+    def forgetKey(self, table, row):
+        keys = self.keys[table]
+        key = row[TABLES[table][0]]
+        if keys.get(key) is row:
+            del keys[key]
+
+
+# Az alkalmazás minden része ugyanazt a gyorsítótárat használja
+_master_data = None
+
+
+def getMasterData(repository):
+    global _master_data
+    if _master_data is None or _master_data.repository is not repository:
+        _master_data = MasterData(repository)
+    return _master_data
@@ -0,0 +1,77 @@
+# Verziózott sémaváltozások. Az adatbázis PRAGMA user_version értéke az utolsó
+# lefutott lépés száma, induláskor csak az újabb lépések futnak. Minden lépés
+# saját tranzakcióban fut a verzió átírásával együtt, így hiba esetén semmi sem
+# marad félbe. Új lépés mindig a lista végére kerül, a meglévőket nem módosítjuk.
+# Az alap táblákat a Repository.createTables hozza létre (0. verzió).
+import time
+from profiler import profiler
+
+MIGRATION_LOG_INSERT = "INSERT OR REPLACE INTO schema_migrations (version, name, ms) VALUES (?, ?, ?)"
+
+
+def uniqueNames(conn):
+    # Az azonos nevű törzsadatok közül a legutóbb felvett marad meg, a díjszámítás
+    # eddig is azt használta, így az árak nem változnak. Utána egyedi index.
+    removed = 0
+    for table, key_column in [('factories', 'nev'), ('addresses', 'cim'), ('zones', 'nev')]:
+        removed += conn.execute(f'''
+            DELETE FROM {table} WHERE {key_column} IS NOT NULL AND id NOT IN (
+                SELECT max(id) FROM {table} WHERE {key_column} IS NOT NULL GROUP BY {key_column})
+        ''').rowcount
+        conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{table}_{key_column} ON {table} ({key_column})")
+    return removed
+
+
+def deliveryAddressIndex(conn):
+    # A cím díjtétel változásakor az érintett fuvarokat cím szerint keressük
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_deliveries_address ON deliveries (address)")
+
+
+def masterPageIndexes(conn):
+    # A törzsadat kezelő lapozása (rendezési kifejezés, id) szerint ugrik a lap
+    # elejére; az árra rendezéshez kifejezés index kell. A név index a LIKE
+    # előtag szűrést is kiszolgálja, ez váltja a korábbi egyoszlopos indexet.
+    for table, key_column, price_column in [('factories', 'nev', 'fuvardij'),
+                                            ('addresses', 'cim', 'ar'), ('zones', 'nev', 'alapdij')]:
+        conn.execute(f"DROP INDEX IF EXISTS idx_{table}_{key_column}")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{key_column}_page "
+                     f"ON {table} ({key_column} COLLATE NOCASE, id)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{price_column}_page "
+                     f"ON {table} (coalesce({price_column}, 0), id)")
+
+
+MIGRATIONS = [
+    (1, "egyedi gyár, cím és övezet nevek", uniqueNames),
+    (2, "fuvar cím index", deliveryAddressIndex),
+    (3, "törzsadat lapozó indexek", masterPageIndexes),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schemaVersion(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    # A lefutott lépések listája: verzió, név és idő ezredmásodpercben.
+    # Újabb programverzió által már továbbléptetett adatbázishoz nem nyúlunk.
+    applied = []
+    for version, name, step in MIGRATIONS:
+        if schemaVersion(conn) >= version:
+            continue
+        with profiler.span(f"migráció {version}"):
+            started = time.perf_counter()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Egy párhuzamosan induló másik folyamat közben lefuttathatta
+                if schemaVersion(conn) < version:
+                    step(conn)
+                    conn.execute(f"PRAGMA user_version = {version}")
+                    ms = round((time.perf_counter() - started) * 1000, 2)
+                    conn.execute(MIGRATION_LOG_INSERT, (version, name, ms))
+                    applied.append({'version': version, 'name': name, 'ms': ms})
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+    return applied
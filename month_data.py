@@ -0,0 +1,134 @@
+import calendar
+from datetime import date, timedelta
+from master_data import getMasterData
+from work_time import WorkMonth
+
+# Magyar napnevek
+DAY_NAMES = ['Hétfő', 'Kedd', 'Szerda', 'Csütörtök', 'Péntek', 'Szombat', 'Vasárnap']
+
+WORK_HEADERS = ["Dátum", "Nap", "Munka KB", "Munka BF",
+                "Ledolgozott óra", "Műhely KB", "Műhely BF", "Munka típusa"]
+
+
+def monthRange(year, month):
+    first_day = date(year, month, 1)
+    last_day = date(year, month, calendar.monthrange(year, month)[1])
+    return first_day, last_day
+
+
+def monthsBetween(first_day, last_day):
+    # (év, hónap) párok a két dátum között, mindkét végpontot beleértve
+    for index in range(first_day.year * 12 + first_day.month - 1, last_day.year * 12 + last_day.month):
+        yield index // 12, index % 12 + 1
+
+
+def workMonth(repository, first_day, last_day):
+    work = WorkMonth(first_day, (last_day - first_day).days + 1)
+    work.fill(repository.workHoursBetween(first_day, last_day))
+    return work
+
+
+def deliveryDayTotals(rows, zones):
+    # (dátum, övezet oszlop) -> m3 összeg
+    totals = {}
+    for row in rows:
+        col = zones.column(row['km_range'])
+        if col > 0:
+            key = (row['date'], col)
+            totals[key] = totals.get(key, 0) + row['m3_total']
+    return totals
+
+
+def monthSpans(first_day, last_day):
+    # A tartomány hónapokra bontva, így egyszerre csak egy hónap van a memóriában
+    for year, month in monthsBetween(first_day, last_day):
+        month_first, month_last = monthRange(year, month)
+        yield max(first_day, month_first), min(last_day, month_last)
+
+
+def monthProgress(first_day, last_day, progress, sheets):
+    # Hónaponként és munkalaponként egy lépés
+    if progress is None:
+        return None
+    total = len(list(monthsBetween(first_day, last_day))) * sheets
+    done = [0]
+
+    def step():
+        progress(done[0], total)
+        done[0] += 1
+    return step
+
+
+def days(first_day, last_day):
+    day = first_day
+    while day <= last_day:
+        yield day
+        day += timedelta(days=1)
+
+
+def workRows(repository, first_day, last_day, progress=None):
+    # Kimutatás sorok naponként, a táblázat oszlopainak sorrendjében
+    for span_first, span_last in monthSpans(first_day, last_day):
+        if progress:
+            progress()
+        work = workMonth(repository, span_first, span_last)
+        for index, day in enumerate(days(span_first, span_last)):
+            values = work.dayValues(index)
+            if values[2] is not None:
+                values[2] = round(values[2], 2)
+            yield [day.isoformat(), DAY_NAMES[day.weekday()]] + values
+
+
+def workSummaryRows(repository, first_day, last_day, progress=None):
+    # Hónaponként a heti és a havi összegek munkatípusonként
+    for span_first, span_last in monthSpans(first_day, last_day):
+        if progress:
+            progress()
+        work = workMonth(repository, span_first, span_last)
+        for row in work.summaryRows(f"{span_first:%Y-%m}"):
+            yield [round(value, 2) if isinstance(value, float) else value for value in row]
+
+
+def aggregateDayTotals(rows, zones):
+    # Az előre összesített napi sorokból: (dátum, övezet oszlop) -> m3 és dátum -> összeg
+    totals, amounts = {}, {}
+    for row in rows:
+        col = zones.column(row['zone'])
+        if col > 0:
+            key = (row['date'], col)
+            totals[key] = totals.get(key, 0) + row['m3']
+        amounts[row['date']] = amounts.get(row['date'], 0) + row['revenue']
+    return totals, amounts
+
+
+def deliveryHeaders(repository):
+    return getMasterData(repository).zoneRegistry().headers
+
+
+def deliveryRows(repository, first_day, last_day, progress=None):
+    zones = getMasterData(repository).zoneRegistry()
+    for span_first, span_last in monthSpans(first_day, last_day):
+        if progress:
+            progress()
+        totals, amounts = aggregateDayTotals(repository.dailyAggregates(span_first, span_last), zones)
+        for day in days(span_first, span_last):
+            date_text = day.isoformat()
+            row = [date_text]
+            for col in zones.zoneColumns():
+                row.append(totals.get((date_text, col)))
+            row.append(amounts.get(date_text))
+            yield row
+
+
+TRIP_HEADERS = ["Dátum", "Övezet", "Gyár", "Cím", "Szállítószám", "M3"]
+
+
+def tripRows(repository, first_day, last_day, progress=None):
+    # Fuvaronként egy sor, így az import a fuvarszámot és a díjat is visszaállítja
+    for span_first, span_last in monthSpans(first_day, last_day):
+        if progress:
+            progress()
+        for data in repository.deliveriesBetween(span_first, span_last):
+            m3_values = data['m3_values']
+            m3 = m3_values[0] if len(m3_values) == 1 else " ".join(str(value) for value in m3_values)
+            yield [data['date'], data['km_range'], data['factory'], data['address'], data['delivery_number'], m3]
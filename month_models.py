@@ -0,0 +1,135 @@
+from collections import OrderedDict
+from table_models import DateTableModel
+from month_data import WORK_HEADERS, monthRange, deliveryDayTotals
+from pricing import PricingEngine
+from work_time import WorkMonth
+from profiler import timed
+
+# Ennyi teljesen felépített hónap marad a memóriában
+MONTH_CACHE_SIZE = 6
+
+
+def deliveryFormats(zones):
+    formats = {col: "{:.1f}" for col in zones.zoneColumns()}
+    formats[zones.amount_column] = "{:,.0f} Ft"
+    return formats
+
+
+def fetchMonth(repository, year, month):
+    # Csak adatbázis olvasás, háttérszálon is hívható
+    first_day, last_day = monthRange(year, month)
+    return repository.workHoursBetween(first_day, last_day), repository.deliveriesBetween(first_day, last_day)
+
+
+class MonthModels:
+    # Egy hónap munkaóra és fuvar modellje, a hónap fuvarjainak árazásával
+    def __init__(self, year, month, zones, master_data):
+        self.year = year
+        self.month = month
+        self.zones = zones
+        first_day, last_day = monthRange(year, month)
+        days = (last_day - first_day).days + 1
+
+        self.work_model = DateTableModel(WORK_HEADERS, day_name_column=1, formats={4: "{:.2f}"})
+        self.delivery_model = DateTableModel(zones.headers, formats=deliveryFormats(zones))
+        for model in [self.work_model, self.delivery_model]:
+            model.setDateRange(first_day, days)
+        self.pricing = PricingEngine(master_data.factories(), master_data.zones(), master_data.addresses())
+        self.work = WorkMonth(first_day, days)
+
+    @timed()
+    def fill(self, work_rows, deliveries):
+        # A munkaórák napi, heti és havi összegei egy menetben
+        self.work.fill(work_rows)
+        work_updates = []
+        for row in range(self.work.days):
+            work_updates.extend(self.workUpdates(row))
+        self.work_model.setValues(work_updates)
+        self.work_model.setSummary("Összesen", [None] + self.work.summaryValues())
+
+        delivery_updates = []
+        for (date_text, col), m3_sum in deliveryDayTotals(deliveries, self.zones).items():
+            row = self.delivery_model.rowForDate(date_text)
+            if row >= 0:
+                delivery_updates.append((row, col, m3_sum))
+        # A hónap összes fuvarja egy menetben árazva
+        dates = self.pricing.addDeliveries(deliveries)
+        delivery_updates.extend(self.amountUpdates(dates))
+        self.delivery_model.setValues(delivery_updates)
+
+    def amountUpdates(self, dates):
+        updates = []
+        for date_text, amount in self.pricing.dayTotals(dates).items():
+            row = self.delivery_model.rowForDate(date_text)
+            if row >= 0:
+                updates.append((row, self.zones.amount_column, amount))
+        return updates
+
+    def workUpdates(self, row):
+        # A WorkMonth napjai és a táblázat sorai ugyanabban a sorrendben vannak
+        return [(row, col, value) for col, value in enumerate(self.work.dayValues(row), 2)]
+
+    def setWorkDay(self, data):
+        # Csak a nap sora és az összesítő sor változik
+        row = self.work.setDay(data)
+        if row >= 0:
+            self.work_model.setValues(self.workUpdates(row))
+            self.work_model.setSummary("Összesen", [None] + self.work.summaryValues())
+
+    @timed()
+    def addDelivery(self, data):
+        row = self.delivery_model.rowForDate(data['date'])
+        zone_col = self.zones.column(data['km_range'])
+        if zone_col > 0 and row >= 0:
+            # M3 értékek összege hozzáadva a cella számértékéhez
+            self.delivery_model.addValue(row, zone_col, sum(data['m3_values'] or []))
+        dates = self.pricing.addDeliveries([data])
+        self.delivery_model.setValues(self.amountUpdates(dates))
+
+    @timed()
+    def setRate(self, kind, key, value):
+        # Csak az érintett fuvarok és napok számolódnak újra
+        dates = self.pricing.setRate(kind, key, value)
+        self.delivery_model.setValues(self.amountUpdates(dates))
+
+    def total(self):
+        return sum(self.pricing.amounts)
+
+    def weekTotals(self):
+        # (hét felirat, ledolgozott óra) párok
+        return [(self.work.weekLabel(week), self.work.weekWorked(week) / 60) for week in range(len(self.work.weeks))]
+
+
+class MonthCache:
+    # (év, hónap) -> MonthModels, a legrégebben használt esik ki
+    def __init__(self, capacity=MONTH_CACHE_SIZE):
+        self.capacity = capacity
+        self.months = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self.months
+
+    def get(self, key):
+        models = self.months.get(key)
+        if models is not None:
+            self.months.move_to_end(key)
+        return models
+
+    def peek(self, key):
+        # Lekérdezés a használati sorrend módosítása nélkül
+        return self.months.get(key)
+
+    def put(self, key, models):
+        self.months[key] = models
+        self.months.move_to_end(key)
+        while len(self.months) > self.capacity:
+            self.months.popitem(last=False)
+
+    def discard(self, key):
+        self.months.pop(key, None)
+
+    def values(self):
+        return list(self.months.values())
+
+    def clear(self):
+        self.months.clear()
@@ -0,0 +1,117 @@
+from array import array
+from itertools import compress
+
+# Díjszámítás fuvaronként:
+#   összeg = övezet alapdíj + díjtétel * m3
+# ahol a díjtétel a cím egyedi ára, ha van ilyen, különben a gyár fuvardíja.
+#
+# A fuvarok oszloponként, tömbökben vannak tárolva; az övezet, gyár és cím
+# szótárkódolt kis egész szám. A számítás egyetlen menetben fut a teljes
+# betöltött időszakra, díjtétel változásnál csak az érintett sorokra.
+
+
+def zoneKey(zone_text):
+    # "Övezet 0-5" és "0-5" ugyanaz az övezet
+    text = (zone_text or "").strip()
+    if text.startswith("Övezet"):
+        text = text[len("Övezet"):].strip()
+    return text
+
+
+class Dictionary:
+    # Szöveg -> kis egész kód, és kódonként a hozzá tartozó sorok
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+        self.rows = []
+
+    def encode(self, value, row):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+            self.rows.append(array('I'))
+        self.rows[code].append(row)
+        return code
+
+
+class PricingEngine:
+    def __init__(self, factories=(), zones=(), addresses=()):
+        self.factory_rates = {row['nev']: row['fuvardij'] or 0 for row in factories}
+        self.zone_fees = {zoneKey(row['nev']): row['alapdij'] or 0 for row in zones}
+        self.address_rates = {row['cim']: row['ar'] or 0 for row in addresses}
+        self.clear()
+
+    def clear(self):
+        # A díjtételek maradnak, a betöltött fuvarok törlődnek
+        self.dates = []
+        self.zone_codes = array('H')
+        self.factory_codes = array('H')
+        self.address_codes = array('I')
+        self.m3 = array('d')
+        self.amounts = array('d')
+        self.zones = Dictionary()
+        self.factories = Dictionary()
+        self.addresses = Dictionary()
+
+    def addDeliveries(self, rows):
+        # Új fuvarok hozzáadása, majd az új sorok árazása egy menetben
+        first = len(self.dates)
+        for row in rows:
+            index = len(self.dates)
+            self.dates.append(row['date'])
+            self.zone_codes.append(self.zones.encode(zoneKey(row.get('km_range')), index))
+            self.factory_codes.append(self.factories.encode(row.get('factory') or "", index))
+            self.address_codes.append(self.addresses.encode(row.get('address') or "", index))
+            self.m3.append(row.get('m3_total', sum(row.get('m3_values') or [])))
+        self.amounts.extend(self.priceRows(range(first, len(self.dates))))
+        return set(self.dates[first:])
+
+    def priceRows(self, rows):
+        # Kódonkénti díjtáblák, majd egyetlen map a kijelölt sorokon
+        zone_fee = [self.zone_fees.get(z, 0) for z in self.zones.values]
+        factory_rate = [self.factory_rates.get(f, 0) for f in self.factories.values]
+        address_rate = [self.address_rates.get(a, 0) for a in self.addresses.values]
+        zone_codes, factory_codes, address_codes, m3 = (
+            self.zone_codes, self.factory_codes, self.address_codes, self.m3)
+        return array('d', map(
+            lambda i: zone_fee[zone_codes[i]]
+            + (address_rate[address_codes[i]] or factory_rate[factory_codes[i]]) * m3[i],
+            rows))
+
+    def setRate(self, kind, key, value):
+        # kind: 'factory', 'zone' vagy 'address'; value None, ha törölték.
+        # Csak az érintett sorokat árazza újra, és visszaadja azok dátumait.
+        if kind == 'factory':
+            rates, dictionary = self.factory_rates, self.factories
+        elif kind == 'zone':
+            key = zoneKey(key)
+            rates, dictionary = self.zone_fees, self.zones
+        else:
+            rates, dictionary = self.address_rates, self.addresses
+        if value is None:
+            rates.pop(key, None)
+        else:
+            rates[key] = value
+
+        code = dictionary.codes.get(key)
+        if code is None:
+            return set()
+        rows = dictionary.rows[code]
+        for index, amount in zip(rows, self.priceRows(rows)):
+            self.amounts[index] = amount
+        return {self.dates[index] for index in rows}
+
+    def dayTotals(self, dates=None):
+        # dátum -> összeg; ha 'dates' meg van adva, csak azokra a napokra
+        totals = {}
+        if dates is None:
+            pairs = zip(self.dates, self.amounts)
+        else:
+            wanted = set(dates)
+            mask = [d in wanted for d in self.dates]
+            pairs = zip(compress(self.dates, mask), compress(self.amounts, mask))
+        for date_text, amount in pairs:
+            totals[date_text] = totals.get(date_text, 0) + amount
+        return totals
+
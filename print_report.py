@@ -0,0 +1,31 @@
+from html import escape
+
+from month_data import WORK_HEADERS, workRows, workSummaryRows, deliveryHeaders, deliveryRows, monthProgress
+from work_time import SUMMARY_HEADERS
+
+
+def tableHtml(title, headers, rows):
+    parts = [f"<h2>{escape(title)}</h2>",
+             '<table border="1" cellspacing="0" cellpadding="3" width="100%">', "<tr>"]
+    parts.extend(f"<th>{escape(header)}</th>" for header in headers)
+    parts.append("</tr>")
+    for row in rows:
+        parts.append("<tr>")
+        for value in row:
+            if isinstance(value, float):
+                value = f"{value:.2f}"
+            parts.append(f"<td>{escape(str(value)) if value is not None else ''}</td>")
+        parts.append("</tr>")
+    parts.append("</table>")
+    return "".join(parts)
+
+
+def reportHtml(repository, first_day, last_day, progress=None):
+    # A nyomtatandó dokumentum az adatbázisból készül, nem a táblázatokból
+    step = monthProgress(first_day, last_day, progress, 3)
+    title = f"Fuvar Adminisztráció {first_day} - {last_day}"
+    return (f"<html><body><h1>{escape(title)}</h1>"
+            + tableHtml("Munkaórák", WORK_HEADERS, workRows(repository, first_day, last_day, step))
+            + tableHtml("Fuvar adatok", deliveryHeaders(repository), deliveryRows(repository, first_day, last_day, step))
+            + tableHtml("Munkaidő összesítés", SUMMARY_HEADERS, workSummaryRows(repository, first_day, last_day, step))
+            + "</body></html>")
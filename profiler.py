@@ -0,0 +1,154 @@
+# Futásidő mérés a forró pontokon: a felület slotjai és az adatbázis hívások
+# köré tett szakaszok (span) idejét, sorszámát és a bennük töltött SQLite időt
+# egy körkörös pufferbe gyűjti. Kikapcsolva egy feltétel vizsgálat a költsége.
+#   FUVAR_PROFILE=1 python main.py   - mérés induláskor bekapcsolva
+#   Ctrl+Shift+D a főablakban        - diagnosztika ablak
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+# Ennyi legutóbbi szakasz marad meg
+RING_SIZE = 5000
+
+
+class Span:
+    __slots__ = ('profiler', 'name', 'sql', 'start', 'duration', 'rows', 'sql_time', 'sql_count',
+                 'thread', 'depth')
+
+    def __init__(self, profiler, name, sql=False):
+        self.profiler = profiler
+        self.name = name
+        self.sql = sql
+        self.rows = None
+        self.sql_time = 0.0
+        self.sql_count = 0
+
+    def __enter__(self):
+        stack = self.profiler.stack()
+        self.depth = len(stack)
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        stack = self.profiler.stack()
+        stack.pop()
+        # Az adatbázis idő minden befoglaló szakaszhoz hozzáadódik, egymásba
+        # ágyazott adatbázis hívásoknál csak a legkülső
+        if self.sql and not (stack and stack[-1].sql):
+            for parent in stack:
+                parent.sql_time += self.duration
+                parent.sql_count += 1
+        self.thread = threading.current_thread().name
+        self.profiler.spans.append(self)
+        return False
+
+
+class NullSpan:
+    # Kikapcsolt méréskor ez az egy példány áll a szakaszok helyén
+    __slots__ = ('rows',)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+class Profiler:
+    def __init__(self, enabled=False, size=RING_SIZE):
+        self.enabled = enabled
+        self.spans = deque(maxlen=size)
+        self.local = threading.local()
+        self.origin = time.perf_counter()
+
+    def stack(self):
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+    def span(self, name, sql=False):
+        # with profiler.span("név") as span: ... span.rows = n
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, sql)
+
+    def timed(self, name=None, rows=None, sql=False):
+        # Dekorátor; rows: a visszatérési értékből a sorok száma (pl. len)
+        def decorate(fn):
+            span_name = name or fn.__qualname__
+
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with Span(self, span_name, sql) as span:
+                    result = fn(*args, **kwargs)
+                    if rows is not None and result is not None:
+                        span.rows = rows(result)
+                return result
+            return wrapper
+        return decorate
+
+    def setEnabled(self, enabled):
+        self.enabled = enabled
+
+    def clear(self):
+        self.spans.clear()
+
+    def records(self):
+        return [{
+            'name': span.name,
+            'start_ms': round((span.start - self.origin) * 1000, 3),
+            'duration_ms': round(span.duration * 1000, 3),
+            'rows': span.rows,
+            'sql_ms': round(span.sql_time * 1000, 3),
+            'sql_calls': span.sql_count,
+            'thread': span.thread,
+            'depth': span.depth,
+        } for span in list(self.spans)]
+
+    def summary(self):
+        # Név szerinti összesítés, a legtöbb időt vivő elöl
+        totals = {}
+        for span in list(self.spans):
+            entry = totals.setdefault(span.name, {'name': span.name, 'count': 0, 'total_ms': 0.0,
+                                                  'max_ms': 0.0, 'rows': 0, 'sql_ms': 0.0})
+            duration = span.duration * 1000
+            entry['count'] += 1
+            entry['total_ms'] += duration
+            entry['max_ms'] = max(entry['max_ms'], duration)
+            entry['rows'] += span.rows or 0
+            entry['sql_ms'] += span.sql_time * 1000
+        for entry in totals.values():
+            entry['mean_ms'] = entry['total_ms'] / entry['count']
+        return sorted(totals.values(), key=lambda entry: entry['total_ms'], reverse=True)
+
+    def saveTrace(self, path):
+        # Chrome trace formátum (chrome://tracing, Perfetto), szálanként külön sávban
+        threads = {}
+        events = []
+        for record in self.records():
+            tid = threads.setdefault(record['thread'], len(threads) + 1)
+            events.append({
+                'name': record['name'], 'ph': 'X', 'pid': 1, 'tid': tid,
+                'ts': round(record['start_ms'] * 1000, 1), 'dur': round(record['duration_ms'] * 1000, 1),
+                'args': {'rows': record['rows'], 'sql_ms': record['sql_ms'], 'sql_calls': record['sql_calls']}
+            })
+        events += [{'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': thread}}
+                   for thread, tid in threads.items()]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+        return len(events)
+
+
+profiler = Profiler(enabled=os.environ.get('FUVAR_PROFILE', '') not in ('', '0'))
+timed = profiler.timed
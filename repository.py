@@ -0,0 +1,720 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from profiler import profiler, timed
+from migrations import migrate, schemaVersion
+
+DB_PATH = 'fuvarok.db'
+WORK_HOURS_LOG = 'work_hours.json'
+DELIVERY_LOG = 'delivery_data.json'
+
+# Ennyi sort írunk egy tranzakcióban a JSONL importnál
+IMPORT_BATCH_SIZE = 500
+
+# Zárolt adatbázisnál ennyi ezredmásodpercig vár a sqlite hiba helyett
+BUSY_TIMEOUT_MS = 5000
+
+# Az sqlite3 modul kapcsolatonként gyorsítótárazza az előkészített utasításokat
+# az SQL szöveg alapján, ezért minden lekérdezés egy állandó szöveg ebben a modulban.
+STATEMENT_CACHE_SIZE = 256
+
+WORK_HOURS_INSERT = '''
+    INSERT INTO work_hours (date, start_time, end_time, type)
+    VALUES (:date, :start_time, :end_time, :type)
+'''
+DELIVERY_INSERT = '''
+    INSERT INTO deliveries (date, km_range, factory, address, delivery_number, m3_values, m3_total)
+    VALUES (:date, :km_range, :factory, :address, :delivery_number, :m3_values, :m3_total)
+'''
+WORK_HOURS_BETWEEN = '''
+    SELECT id, date, start_time, end_time, type FROM work_hours
+    WHERE date BETWEEN ? AND ? ORDER BY date, id
+'''
+DELIVERIES_BETWEEN = '''
+    SELECT id, date, km_range, factory, address, delivery_number, m3_values, m3_total
+    FROM deliveries WHERE date BETWEEN ? AND ? ORDER BY date, id
+'''
+DELIVERY_COLUMNS_BETWEEN = '''
+    SELECT date, km_range, factory, address, m3_values
+    FROM deliveries WHERE date BETWEEN ? AND ? ORDER BY date, id
+'''
+ADDRESS_USAGE = '''
+    SELECT address, COUNT(*) AS uses FROM deliveries
+    WHERE address IS NOT NULL AND address <> '' GROUP BY address
+'''
+DELIVERY_NUMBERS_BETWEEN = '''
+    SELECT date, delivery_number FROM deliveries
+    WHERE date BETWEEN ? AND ? AND delivery_number <> ''
+'''
+DELIVERIES_WITH_NUMBER = '''
+    SELECT id, date, km_range, factory, address, delivery_number, m3_values FROM deliveries
+    WHERE delivery_number <> '' ORDER BY id
+'''
+DELIVERY_DELETE = "DELETE FROM deliveries WHERE id=?"
+WORK_HOURS_DATES = "SELECT DISTINCT date FROM work_hours"
+DELIVERY_DATES = "SELECT DISTINCT date FROM deliveries"
+IMPORT_OFFSET = "SELECT offset FROM imported_logs WHERE path=?"
+IMPORT_PROGRESS = '''
+    INSERT INTO imported_logs (path, offset, rows) VALUES (?, ?, ?)
+    ON CONFLICT(path) DO UPDATE SET offset=excluded.offset, rows=rows + excluded.rows
+'''
+
+FACTORIES_SELECT = "SELECT id, nev, fuvardij FROM factories ORDER BY id"
+FACTORY_INSERT = "INSERT INTO factories (nev, fuvardij) VALUES (?, ?)"
+FACTORY_DELETE = "DELETE FROM factories WHERE id=?"
+ADDRESSES_SELECT = "SELECT id, cim, ar FROM addresses ORDER BY id"
+ADDRESS_INSERT = "INSERT INTO addresses (cim, ar) VALUES (?, ?)"
+ADDRESS_DELETE = "DELETE FROM addresses WHERE id=?"
+ZONES_SELECT = "SELECT id, nev, alapdij FROM zones ORDER BY id"
+ZONE_INSERT = "INSERT INTO zones (nev, alapdij) VALUES (?, ?)"
+ZONE_DELETE = "DELETE FROM zones WHERE id=?"
+# A nevek egyediek (lásd migrations.py): már meglévő névnél az ár frissül
+FACTORY_SAVE = FACTORY_INSERT + " ON CONFLICT (nev) DO UPDATE SET fuvardij = excluded.fuvardij"
+FACTORY_ID = "SELECT id FROM factories WHERE nev = ?"
+ADDRESS_SAVE = ADDRESS_INSERT + " ON CONFLICT (cim) DO UPDATE SET ar = excluded.ar"
+ADDRESS_ID = "SELECT id FROM addresses WHERE cim = ?"
+ZONE_SAVE = ZONE_INSERT + " ON CONFLICT (nev) DO UPDATE SET alapdij = excluded.alapdij"
+ZONE_ID = "SELECT id FROM zones WHERE nev = ?"
+MIGRATION_LOG = "SELECT version, name, applied_at, ms FROM schema_migrations ORDER BY version"
+
+# Törzsadat táblák lapozható listázása: tábla -> (kulcs oszlop, ár oszlop)
+MASTER_TABLES = {
+    'factories': ('nev', 'fuvardij'),
+    'addresses': ('cim', 'ar'),
+    'zones': ('nev', 'alapdij'),
+}
+# Ennyi sort kér le egyszerre a törzsadat kezelő
+MASTER_PAGE_SIZE = 200
+
+
+def masterSortExpression(table, column):
+    # A névre kis- és nagybetűtől függetlenül rendezünk, ezt az index is így tárolja
+    key_column, price_column = MASTER_TABLES[table]
+    if column == key_column:
+        return f"{key_column} COLLATE NOCASE"
+    if column == price_column:
+        return f"coalesce({price_column}, 0)"
+    return "id"
+
+
+def masterPageSql(table, column, descending, filtered, after):
+    # Lapozás kulcs alapján (keyset): az előző lap utolsó (rendezési érték, id)
+    # párja utáni sorok, így a lap lekérése nem függ attól, hányadik lapnál tartunk.
+    # A szöveg csak véges sok változatban állhat elő, így az utasítás gyorsítótár működik.
+    key_column, price_column = MASTER_TABLES[table]
+    sort = masterSortExpression(table, column)
+    direction, compare = ("DESC", "<") if descending else ("ASC", ">")
+    conditions = []
+    if filtered:
+        conditions.append(f"{key_column} LIKE ? ESCAPE '\\'")
+    if after:
+        # A sorérték összehasonlítás ((rendezés, id) > (?, ?)) helyett így az SQLite
+        # az indexben a kezdőpontra ugrik, nem pörgeti végig az elejétől
+        conditions.append(f"{sort} {compare}= ? AND ({sort} {compare} ? OR id {compare} ?)")
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return (f"SELECT id, {key_column}, {price_column} FROM {table} {where} "
+            f"ORDER BY {sort} {direction}, id {direction} LIMIT ?")
+
+
+def sortValue(table, column, row):
+    # A rendezési kifejezés értéke egy sorra, a következő lap kezdőpontjához
+    key_column, price_column = MASTER_TABLES[table]
+    if column == key_column:
+        return row[key_column]
+    if column == price_column:
+        return row[price_column] or 0
+    return row['id']
+
+
+def likePrefix(text):
+    escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return escaped + '%'
+
+# Előre összesített fuvar adatok: nap x övezet x gyár, illetve hónap x övezet x gyár.
+# A deliveries táblán lévő triggerek ugyanabban a tranzakcióban frissítik őket,
+# mint a fuvar beszúrását vagy törlését, a havi táblát a napi tábla triggerei.
+# A díj számítása megegyezik a pricing.py-val:
+#   övezet alapdíj + (cím egyedi ára, különben gyár fuvardíja) * m3
+ZONE_KEY = "trim(replace(coalesce({0}, ''), 'Övezet', ''))"
+DELIVERY_PRICES_VIEW = f'''
+    CREATE VIEW IF NOT EXISTS delivery_prices AS
+    SELECT d.id, d.date, {ZONE_KEY.format('d.km_range')} AS zone,
+           coalesce(d.factory, '') AS factory, d.address, coalesce(d.m3_total, 0) AS m3,
+           coalesce((SELECT z.alapdij FROM zones z
+                     WHERE {ZONE_KEY.format('z.nev')} = {ZONE_KEY.format('d.km_range')}
+                     ORDER BY z.id DESC LIMIT 1), 0)
+           + coalesce(nullif((SELECT a.ar FROM addresses a WHERE a.cim = d.address
+                              ORDER BY a.id DESC LIMIT 1), 0),
+                      (SELECT f.fuvardij FROM factories f WHERE f.nev = d.factory
+                       ORDER BY f.id DESC LIMIT 1), 0) * coalesce(d.m3_total, 0) AS revenue
+    FROM deliveries d
+'''
+# Egy (nap, övezet, gyár) csoport újraszámolása a nyers fuvarokból
+DAILY_GROUP_REFRESH = f'''
+    DELETE FROM delivery_daily
+    WHERE date = {{row}}.date AND zone = {ZONE_KEY.format('{row}.km_range')}
+      AND factory = coalesce({{row}}.factory, '');
+    INSERT INTO delivery_daily (date, zone, factory, m3, trips, revenue)
+    SELECT date, zone, factory, sum(m3), count(*), sum(revenue) FROM delivery_prices
+    WHERE date = {{row}}.date AND zone = {ZONE_KEY.format('{row}.km_range')}
+      AND factory = coalesce({{row}}.factory, '')
+    GROUP BY date, zone, factory;
+'''
+# Díjtétel változásnál csak az érintett csoportok bevétele számolódik újra
+DAILY_REPRICE = '''
+    UPDATE delivery_daily SET revenue = (
+        SELECT coalesce(sum(p.revenue), 0) FROM delivery_prices p
+        WHERE p.date = delivery_daily.date AND p.zone = delivery_daily.zone
+          AND p.factory = delivery_daily.factory)
+    WHERE {0};
+'''
+AGGREGATE_TRIGGERS = [
+    '''CREATE TRIGGER IF NOT EXISTS deliveries_aggregate_insert AFTER INSERT ON deliveries BEGIN
+        INSERT INTO delivery_daily (date, zone, factory, m3, trips, revenue)
+        SELECT date, zone, factory, m3, 1, revenue FROM delivery_prices WHERE id = NEW.id
+        ON CONFLICT (date, zone, factory) DO UPDATE SET
+            m3 = m3 + excluded.m3, trips = trips + 1, revenue = revenue + excluded.revenue;
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS deliveries_aggregate_delete AFTER DELETE ON deliveries BEGIN
+        {DAILY_GROUP_REFRESH.format(row='OLD')}
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS deliveries_aggregate_update AFTER UPDATE ON deliveries BEGIN
+        {DAILY_GROUP_REFRESH.format(row='OLD')}
+        {DAILY_GROUP_REFRESH.format(row='NEW')}
+    END''',
+    # A havi tábla a napi tábla változásaiból, különbséggel frissül
+    '''CREATE TRIGGER IF NOT EXISTS daily_monthly_insert AFTER INSERT ON delivery_daily BEGIN
+        INSERT INTO delivery_monthly (month, zone, factory, m3, trips, revenue)
+        VALUES (substr(NEW.date, 1, 7), NEW.zone, NEW.factory, NEW.m3, NEW.trips, NEW.revenue)
+        ON CONFLICT (month, zone, factory) DO UPDATE SET
+            m3 = m3 + excluded.m3, trips = trips + excluded.trips, revenue = revenue + excluded.revenue;
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS daily_monthly_update AFTER UPDATE ON delivery_daily BEGIN
+        UPDATE delivery_monthly SET
+            m3 = m3 + NEW.m3 - OLD.m3, trips = trips + NEW.trips - OLD.trips,
+            revenue = revenue + NEW.revenue - OLD.revenue
+        WHERE month = substr(NEW.date, 1, 7) AND zone = NEW.zone AND factory = NEW.factory;
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS daily_monthly_delete AFTER DELETE ON delivery_daily BEGIN
+        UPDATE delivery_monthly SET
+            m3 = m3 - OLD.m3, trips = trips - OLD.trips, revenue = revenue - OLD.revenue
+        WHERE month = substr(OLD.date, 1, 7) AND zone = OLD.zone AND factory = OLD.factory;
+        DELETE FROM delivery_monthly
+        WHERE month = substr(OLD.date, 1, 7) AND zone = OLD.zone AND factory = OLD.factory
+          AND trips <= 0;
+    END''',
+]
+
+
+def masterDataTriggers():
+    # Törzsadat változásnál (hozzáadás, törlés, módosítás) az érintett csoportok
+    triggers = []
+    for table, condition in [
+        ('factories', "factory IN ({old}.nev, {new}.nev)"),
+        ('zones', f"zone IN ({ZONE_KEY.format('{old}.nev')}, {ZONE_KEY.format('{new}.nev')})"),
+        ('addresses', "(date, zone, factory) IN (SELECT date, zone, factory FROM delivery_prices"
+                      " WHERE address IN ({old}.cim, {new}.cim))"),
+    ]:
+        for event, old, new in [('INSERT', 'NEW', 'NEW'), ('UPDATE', 'OLD', 'NEW'), ('DELETE', 'OLD', 'OLD')]:
+            triggers.append(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_aggregate_{event.lower()} "
+                f"AFTER {event} ON {table} BEGIN "
+                f"{DAILY_REPRICE.format(condition.format(old=old, new=new))} END")
+    return triggers
+
+
+AGGREGATE_TRIGGERS.extend(masterDataTriggers())
+
+AGGREGATES_REBUILD = '''
+    INSERT INTO delivery_daily (date, zone, factory, m3, trips, revenue)
+    SELECT date, zone, factory, sum(m3), count(*), sum(revenue) FROM delivery_prices
+    GROUP BY date, zone, factory
+'''
+DAILY_AGGREGATES_BETWEEN = '''
+    SELECT date, zone, factory, m3, trips, revenue FROM delivery_daily
+    WHERE date BETWEEN ? AND ? ORDER BY date, zone, factory
+'''
+MONTH_SUMMARY = '''
+    SELECT zone, factory, m3, trips, revenue FROM delivery_monthly
+    WHERE month = ? ORDER BY zone, factory
+'''
+YEAR_SUMMARY = '''
+    SELECT month, sum(m3) AS m3, sum(trips) AS trips, sum(revenue) AS revenue
+    FROM delivery_monthly WHERE month BETWEEN ? AND ? GROUP BY month ORDER BY month
+'''
+
+# Teljes szöveges keresés a fuvarok címében és szállítószámában. A trigram
+# tokenizáló bármely legalább 3 karakteres szövegrészre keres, nem csak szó elejére.
+# Külső tartalmú tábla: a szöveget a deliveries tárolja, a triggerek csak az indexet tartják karban.
+SEARCH_MIN_LENGTH = 3
+SEARCH_LIMIT = 500
+DELIVERIES_FTS = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS deliveries_fts USING fts5(
+        address, delivery_number,
+        content='deliveries', content_rowid='id', tokenize='trigram'
+    )
+'''
+DELIVERIES_FTS_REBUILD = "INSERT INTO deliveries_fts (deliveries_fts) VALUES ('rebuild')"
+SEARCH_TRIGGERS = [
+    '''CREATE TRIGGER IF NOT EXISTS deliveries_fts_insert AFTER INSERT ON deliveries BEGIN
+        INSERT INTO deliveries_fts (rowid, address, delivery_number)
+        VALUES (NEW.id, NEW.address, NEW.delivery_number);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS deliveries_fts_delete AFTER DELETE ON deliveries BEGIN
+        INSERT INTO deliveries_fts (deliveries_fts, rowid, address, delivery_number)
+        VALUES ('delete', OLD.id, OLD.address, OLD.delivery_number);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS deliveries_fts_update
+    AFTER UPDATE OF address, delivery_number ON deliveries BEGIN
+        INSERT INTO deliveries_fts (deliveries_fts, rowid, address, delivery_number)
+        VALUES ('delete', OLD.id, OLD.address, OLD.delivery_number);
+        INSERT INTO deliveries_fts (rowid, address, delivery_number)
+        VALUES (NEW.id, NEW.address, NEW.delivery_number);
+    END''',
+]
+# Üres szűrő ('') mindenre illeszkedik; a legújabb találatok elöl
+DELIVERY_SEARCH = f'''
+    SELECT d.id, d.date, d.km_range, d.factory, d.address, d.delivery_number, d.m3_values, d.m3_total
+    FROM deliveries_fts JOIN deliveries d ON d.id = deliveries_fts.rowid
+    WHERE deliveries_fts MATCH :match
+      AND d.date BETWEEN :first_date AND :last_date
+      AND (:zone = '' OR {ZONE_KEY.format('d.km_range')} = {ZONE_KEY.format(':zone')})
+      AND (:factory = '' OR d.factory = :factory)
+    ORDER BY d.date DESC, d.id DESC LIMIT :limit
+'''
+
+DEFAULT_FACTORIES = [
+    ('CATL', 5000),
+    ('BMW', 6000),
+    ('Gyár 3', 5500)
+]
+
+
+def normalizeWorkHours(data):
+    return {
+        'date': data['date'],
+        'start_time': data.get('start_time', ''),
+        'end_time': data.get('end_time', ''),
+        'type': data.get('type', '')
+    }
+
+
+def normalizeDelivery(data):
+    # A régi sorokban egyetlen 'm3' érték van, az újakban 'm3_values' lista
+    if 'm3_values' in data:
+        m3_values = [float(v) for v in data['m3_values']]
+    elif data.get('m3') is not None:
+        m3_values = [float(data['m3'])]
+    else:
+        m3_values = []
+    return {
+        'date': data['date'],
+        'km_range': data.get('km_range', ''),
+        'factory': data.get('factory', ''),
+        'address': data.get('address', ''),
+        'delivery_number': data.get('delivery_number', ''),
+        'm3_values': json.dumps(m3_values),
+        'm3_total': sum(m3_values)
+    }
+
+
+def deliveryFromRow(row):
+    data = dict(row)
+    data['m3_values'] = json.loads(data['m3_values'] or '[]')
+    return data
+
+
+def searchTerms(text):
+    # A keresett szöveg szavai; a trigram index csak a legalább 3 karakteresekre keres
+    return [term for term in text.split() if len(term) >= SEARCH_MIN_LENGTH]
+
+
+def matchExpression(terms):
+    # Minden szó idézőjeles kifejezésként, így a keresett szöveg nem FTS5 szintaxis
+    return " AND ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def connect(db_path=DB_PATH):
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_MS / 1000,
+                           check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
+    # WAL módban az olvasók nem várnak az írókra és fordítva
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    return conn
+
+
+# Az alkalmazás összes része ugyanazt a példányt és kapcsolatot használja
+_repository = None
+
+
+def getRepository(db_path=DB_PATH):
+    global _repository
+    if _repository is None:
+        _repository = Repository(connect(db_path))
+    return _repository
+
+
+def closeRepository():
+    global _repository
+    if _repository is not None:
+        _repository.close()
+        _repository = None
+
+
+class Repository:
+    def __init__(self, conn):
+        self.conn = conn
+        # A kapcsolatot a háttérszálak is használják, egyszerre csak egy hívás fut rajta
+        self.lock = threading.RLock()
+        self.createTables()
+        # Az induláskor lefutott sémaváltozások és idejük
+        with self.lock:
+            self.applied_migrations = migrate(self.conn)
+
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
+
+    @contextmanager
+    def transaction(self):
+        with self.lock:
+            with self.conn:
+                yield self.conn
+
+    @timed(sql=True)
+    def commit(self):
+        with self.lock:
+            self.conn.commit()
+
+    def rollback(self):
+        with self.lock:
+            self.conn.rollback()
+
+    @timed(rows=len, sql=True)
+    def query(self, sql, params=()):
+        with self.lock:
+            cursor = self.conn.execute(sql, params)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor]
+
+    def createTables(self):
+        with self.transaction() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS factories (
+                    id INTEGER PRIMARY KEY,
+                    nev TEXT,
+                    fuvardij INTEGER
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS addresses (
+                    id INTEGER PRIMARY KEY,
+                    cim TEXT,
+                    ar INTEGER
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS zones (
+                    id INTEGER PRIMARY KEY,
+                    nev TEXT,
+                    alapdij INTEGER
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS work_hours (
+                    id INTEGER PRIMARY KEY,
+                    date TEXT NOT NULL,
+                    start_time TEXT,
+                    end_time TEXT,
+                    type TEXT
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS deliveries (
+                    id INTEGER PRIMARY KEY,
+                    date TEXT NOT NULL,
+                    km_range TEXT,
+                    factory TEXT,
+                    address TEXT,
+                    delivery_number TEXT,
+                    m3_values TEXT,
+                    m3_total REAL
+                )
+            ''')
+            # Az importált naplófájlok és a feldolgozott bájt pozíció
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS imported_logs (
+                    path TEXT PRIMARY KEY,
+                    offset INTEGER,
+                    rows INTEGER
+                )
+            ''')
+            # A lefutott sémaváltozások naplója, a verzió a PRAGMA user_version-ben
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    name TEXT,
+                    applied_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    ms REAL
+                )
+            ''')
+            # Összesítő táblák, lásd AGGREGATE_TRIGGERS
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS delivery_daily (
+                    date TEXT NOT NULL,
+                    zone TEXT NOT NULL,
+                    factory TEXT NOT NULL,
+                    m3 REAL NOT NULL,
+                    trips INTEGER NOT NULL,
+                    revenue REAL NOT NULL,
+                    PRIMARY KEY (date, zone, factory)
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS delivery_monthly (
+                    month TEXT NOT NULL,
+                    zone TEXT NOT NULL,
+                    factory TEXT NOT NULL,
+                    m3 REAL NOT NULL,
+                    trips INTEGER NOT NULL,
+                    revenue REAL NOT NULL,
+                    PRIMARY KEY (month, zone, factory)
+                )
+            ''')
+            conn.execute(DELIVERY_PRICES_VIEW)
+            # Keresőindex: új adatbázisnál vagy régi adatbázis első indításakor feltöltve
+            search_exists = conn.execute(
+                "SELECT EXISTS (SELECT 1 FROM sqlite_master WHERE name = 'deliveries_fts')").fetchone()[0]
+            conn.execute(DELIVERIES_FTS)
+            for trigger in SEARCH_TRIGGERS:
+                conn.execute(trigger)
+            if not search_exists:
+                conn.execute(DELIVERIES_FTS_REBUILD)
+            for trigger in AGGREGATE_TRIGGERS:
+                conn.execute(trigger)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_work_hours_date ON work_hours (date)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_deliveries_date ON deliveries (date)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_deliveries_km_range ON deliveries (km_range)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_deliveries_factory ON deliveries (factory)")
+            # A törzsadat kezelő szűrő és lapozó indexei a migrations.py-ban vannak
+            # Részleges index a kitöltött szállítószámokra. A meglévő adatokban vannak
+            # ismétlődések, ezért nem UNIQUE; az ellenőrzést a DeliveryNumberIndex végzi.
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_deliveries_number
+                ON deliveries (delivery_number, date) WHERE delivery_number <> ''
+            ''')
+
+            if conn.execute("SELECT COUNT(*) FROM factories").fetchone()[0] == 0:
+                conn.executemany(FACTORY_INSERT, DEFAULT_FACTORIES)
+
+            # Összesítők nélküli régi adatbázisnál egyszeri feltöltés
+            if (conn.execute("SELECT EXISTS (SELECT 1 FROM deliveries)").fetchone()[0]
+                    and not conn.execute("SELECT EXISTS (SELECT 1 FROM delivery_daily)").fetchone()[0]):
+                conn.execute(AGGREGATES_REBUILD)
+
+    # Séma
+    def schemaVersion(self):
+        with self.lock:
+            return schemaVersion(self.conn)
+
+    def migrationLog(self):
+        return self.query(MIGRATION_LOG)
+
+    # Törzsadatok
+    def factories(self):
+        return self.query(FACTORIES_SELECT)
+
+    def factoryNames(self):
+        return [row['nev'] for row in self.factories()]
+
+    def addFactory(self, name, price):
+        with self.transaction() as conn:
+            conn.execute(FACTORY_SAVE, (name, price))
+            return conn.execute(FACTORY_ID, (name,)).fetchone()[0]
+
+    def deleteFactory(self, factory_id):
+        with self.transaction() as conn:
+            conn.execute(FACTORY_DELETE, (factory_id,))
+
+    def addresses(self):
+        return self.query(ADDRESSES_SELECT)
+
+    def addAddress(self, address, price):
+        with self.transaction() as conn:
+            conn.execute(ADDRESS_SAVE, (address, price))
+            return conn.execute(ADDRESS_ID, (address,)).fetchone()[0]
+
+    def deleteAddress(self, address_id):
+        with self.transaction() as conn:
+            conn.execute(ADDRESS_DELETE, (address_id,))
+
+    def zones(self):
+        return self.query(ZONES_SELECT)
+
+    def addZone(self, name, price):
+        with self.transaction() as conn:
+            conn.execute(ZONE_SAVE, (name, price))
+            return conn.execute(ZONE_ID, (name,)).fetchone()[0]
+
+    def deleteZone(self, zone_id):
+        with self.transaction() as conn:
+            conn.execute(ZONE_DELETE, (zone_id,))
+
+    @timed(rows=len, sql=True)
+    def masterPage(self, table, column, descending=False, prefix='', after=None,
+                   limit=MASTER_PAGE_SIZE):
+        # after: az előző lap utolsó sora, vagy None az első lapnál
+        sql = masterPageSql(table, column, descending, bool(prefix), after is not None)
+        params = []
+        if prefix:
+            params.append(likePrefix(prefix))
+        if after is not None:
+            value = sortValue(table, column, after)
+            params.extend([value, value, after['id']])
+        params.append(limit)
+        return self.query(sql, params)
+
+    # Munkaórák és fuvarok
+    # Az insert* metódusok nem commitolnak, a tranzakciót a hívó zárja le
+    def insertWorkHours(self, rows):
+        with profiler.span('Repository.insertWorkHours', sql=True) as span, self.lock:
+            span.rows = len(rows)
+            self.conn.executemany(WORK_HOURS_INSERT, [normalizeWorkHours(r) for r in rows])
+
+    def insertDeliveries(self, rows):
+        with profiler.span('Repository.insertDeliveries', sql=True) as span, self.lock:
+            span.rows = len(rows)
+            self.conn.executemany(DELIVERY_INSERT, [normalizeDelivery(r) for r in rows])
+
+    def workHoursBetween(self, first_date, last_date):
+        # Dátumok 'yyyy-MM-dd' formában, így a szöveges összehasonlítás is helyes
+        return self.query(WORK_HOURS_BETWEEN, (str(first_date), str(last_date)))
+
+    def deliveriesBetween(self, first_date, last_date):
+        rows = self.query(DELIVERIES_BETWEEN, (str(first_date), str(last_date)))
+        return [deliveryFromRow(row) for row in rows]
+
+    @timed(rows=len, sql=True)
+    def deliveryColumnsBetween(self, first_date, last_date):
+        # Sima tuple sorok dict nélkül, az oszlopos tárba töltéshez
+        with self.lock:
+            return self.conn.execute(DELIVERY_COLUMNS_BETWEEN, (str(first_date), str(last_date))).fetchall()
+
+    def addressUsage(self):
+        # cím -> hány fuvarban szerepelt
+        return {row['address']: row['uses'] for row in self.query(ADDRESS_USAGE)}
+
+    def deliveryNumbersBetween(self, first_date, last_date):
+        return self.query(DELIVERY_NUMBERS_BETWEEN, (str(first_date), str(last_date)))
+
+    def deliveriesWithNumber(self):
+        return self.query(DELIVERIES_WITH_NUMBER)
+
+    @timed(sql=True)
+    def deleteDeliveries(self, ids):
+        # Az összesítőket a triggerek ugyanebben a tranzakcióban frissítik
+        with self.transaction() as conn:
+            conn.executemany(DELIVERY_DELETE, [(i,) for i in ids])
+
+    @timed(rows=len, sql=True)
+    def searchDeliveries(self, text, first_date=None, last_date=None, zone='', factory='',
+                         limit=SEARCH_LIMIT):
+        # A legalább 3 karakteres szavak mindegyikét tartalmazó fuvarok, legújabb elöl
+        terms = searchTerms(text)
+        if not terms:
+            return []
+        rows = self.query(DELIVERY_SEARCH, {
+            'match': matchExpression(terms),
+            'first_date': str(first_date or '0000-00-00'),
+            'last_date': str(last_date or '9999-12-31'),
+            'zone': zone or '',
+            'factory': factory or '',
+            'limit': limit,
+        })
+        return [deliveryFromRow(row) for row in rows]
+
+    def workHourDates(self):
+        return {row['date'] for row in self.query(WORK_HOURS_DATES)}
+
+    def deliveryDates(self):
+        return {row['date'] for row in self.query(DELIVERY_DATES)}
+
+    # Összesítők
+    def dailyAggregates(self, first_date, last_date):
+        return self.query(DAILY_AGGREGATES_BETWEEN, (str(first_date), str(last_date)))
+
+    def monthSummary(self, year, month):
+        # Övezet és gyár szerinti bontás, a fuvarok számától független idő alatt
+        return self.query(MONTH_SUMMARY, (f"{year}-{month:02d}",))
+
+    def yearSummary(self, year):
+        # Hónaponkénti összesítés, legfeljebb 12 sor
+        return self.query(YEAR_SUMMARY, (f"{year}-01", f"{year}-12"))
+
+    @timed(rows=int, sql=True)
+    def rebuildAggregates(self):
+        # Teljes újraszámolás a nyers fuvarokból és a jelenlegi díjtételekből
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM delivery_daily")
+            conn.execute("DELETE FROM delivery_monthly")
+            conn.execute(AGGREGATES_REBUILD)
+            return conn.execute("SELECT COUNT(*) FROM delivery_daily").fetchone()[0]
+
+    def importJsonl(self, path, kind, batch_size=IMPORT_BATCH_SIZE):
+        # JSONL napló importja soronként olvasva, kötegelt tranzakciókban.
+        # A feldolgozott bájt pozíciót minden köteggel együtt mentjük, így
+        # egy megszakadt import ott folytatódik, ahol abbahagyta.
+        if not os.path.exists(path):
+            return 0
+        key = os.path.abspath(path)
+        if kind == 'work_hours':
+            sql, normalize = WORK_HOURS_INSERT, normalizeWorkHours
+        else:
+            sql, normalize = DELIVERY_INSERT, normalizeDelivery
+
+        row = self.query(IMPORT_OFFSET, (key,))
+        start_offset = offset = row[0]['offset'] if row else 0
+        imported = 0
+
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            batch = []
+            for line in iter(f.readline, b''):
+                # Félig kiírt utolsó sort nem dolgozunk fel
+                if not line.endswith(b'\n'):
+                    break
+                text = line.decode('utf-8').strip()
+                if text:
+                    try:
+                        batch.append(normalize(json.loads(text)))
+                    except (ValueError, KeyError):
+                        pass
+                offset += len(line)
+                if len(batch) >= batch_size:
+                    self.commitImportBatch(key, sql, batch, offset)
+                    imported += len(batch)
+                    batch = []
+            if offset != start_offset:
+                self.commitImportBatch(key, sql, batch, offset)
+                imported += len(batch)
+        return imported
+
+    def commitImportBatch(self, key, sql, batch, offset):
+        # A sorok és az új pozíció ugyanabban a tranzakcióban kerülnek mentésre
+        with self.transaction() as conn:
+            conn.executemany(sql, batch)
+            conn.execute(IMPORT_PROGRESS, (key, offset, len(batch)))
+
+    def migrateJsonLogs(self):
+        return (self.importJsonl(WORK_HOURS_LOG, 'work_hours'),
+                self.importJsonl(DELIVERY_LOG, 'deliveries'))
+
+
+if __name__ == "__main__":
+    # Egyszeri átköltöztetés: python repository.py
+    work_rows, delivery_rows = getRepository().migrateJsonLogs()
+    closeRepository()
+    print(f"Importálva: {work_rows} munkaóra és {delivery_rows} fuvar sor")
@@ -0,0 +1,183 @@
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLineEdit, QComboBox, QCheckBox,
+    QDateEdit, QLabel, QTableWidget, QTableWidgetItem, QAbstractItemView
+)
+from PySide6.QtCore import QDate, QTimer, Signal
+import time
+from repository import SEARCH_MIN_LENGTH, SEARCH_LIMIT
+
+# Gépelés után ennyi ms-mal indul a keresés
+SEARCH_DELAY_MS = 150
+
+RESULT_HEADERS = ["Dátum", "Övezet", "Gyár", "Cím", "Szállítószám", "M3"]
+ALL_ZONES = "Minden övezet"
+ALL_FACTORIES = "Minden gyár"
+
+
+class DeliverySearchDialog(QDialog):
+    # Keresés a fuvarok címében és szállítószámában (FTS5 index), időszak,
+    # övezet és gyár szerinti szűréssel. Dupla kattintásra vagy Enterre a
+    # főablak a találat napjára ugrik.
+    # Törzsadat változás (tábla, régi sor, új sor); a MasterData értesítése
+    # bármely szálból jöhet, a szűrők frissítése a GUI szálon fut
+    master_changed = Signal(str, object, object)
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.main_window = parent
+        self.results = []
+        self.master_listener = None
+        self.initUI()
+        self.master_changed.connect(self.onMasterDataChanged)
+
+    def initUI(self):
+        self.setWindowTitle("Fuvarok keresése")
+        self.setMinimumWidth(900)
+        self.setMinimumHeight(500)
+        layout = QVBoxLayout()
+
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText(
+            f"Cím vagy szállítószám részlete (legalább {SEARCH_MIN_LENGTH} karakter)")
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.search)
+        self.search_input.textChanged.connect(self.search_timer.start)
+        self.search_input.returnPressed.connect(self.openSelected)
+
+        # Szűrők
+        filter_layout = QHBoxLayout()
+        self.range_check = QCheckBox("Időszak:")
+        today = QDate.currentDate()
+        self.first_date = QDateEdit(QDate(today.year(), 1, 1))
+        self.last_date = QDateEdit(today)
+        for date_edit in [self.first_date, self.last_date]:
+            date_edit.setCalendarPopup(True)
+            date_edit.setDisplayFormat("yyyy-MM-dd")
+            date_edit.setEnabled(False)
+            date_edit.dateChanged.connect(self.search_timer.start)
+        self.range_check.toggled.connect(self.first_date.setEnabled)
+        self.range_check.toggled.connect(self.last_date.setEnabled)
+        self.range_check.toggled.connect(self.search_timer.start)
+
+        self.zone_combo = QComboBox()
+        self.factory_combo = QComboBox()
+        self.fillFilters()
+        for combo in [self.zone_combo, self.factory_combo]:
+            combo.currentIndexChanged.connect(self.search_timer.start)
+
+        filter_layout.addWidget(self.range_check)
+        filter_layout.addWidget(self.first_date)
+        filter_layout.addWidget(QLabel("–"))
+        filter_layout.addWidget(self.last_date)
+        filter_layout.addWidget(self.zone_combo)
+        filter_layout.addWidget(self.factory_combo)
+        filter_layout.addStretch()
+
+        self.result_table = QTableWidget()
+        self.result_table.setColumnCount(len(RESULT_HEADERS))
+        self.result_table.setHorizontalHeaderLabels(RESULT_HEADERS)
+        self.result_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.result_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.result_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.result_table.horizontalHeader().setStretchLastSection(True)
+        self.result_table.cellDoubleClicked.connect(lambda row, col: self.openRow(row))
+
+        self.status_label = QLabel()
+
+        layout.addWidget(self.search_input)
+        layout.addLayout(filter_layout)
+        layout.addWidget(self.result_table)
+        layout.addWidget(self.status_label)
+        self.setLayout(layout)
+
+    def fillFilters(self):
+        master_data = self.main_window.master_data
+        self.fillCombo(self.zone_combo, [ALL_ZONES] + master_data.zoneRegistry().labels)
+        self.fillCombo(self.factory_combo, [ALL_FACTORIES] + master_data.factoryNames())
+
+    def fillCombo(self, combo, items):
+        # A kiválasztott szűrő megmarad, ha még létezik; különben "Minden ..."
+        current = combo.currentText()
+        if items == [combo.itemText(index) for index in range(combo.count())]:
+            return
+        combo.blockSignals(True)
+        combo.clear()
+        combo.addItems(items)
+        index = max(combo.findText(current), 0)
+        combo.setCurrentIndex(index)
+        combo.blockSignals(False)
+        if current and combo.currentText() != current:
+            self.search_timer.start()
+
+    def showEvent(self, event):
+        # Csak látható ablak figyeli a törzsadatokat; a rejtve töltött idő
+        # változásai megnyitáskor töltődnek be
+        if self.master_listener is None:
+            self.master_listener = self.master_changed.emit
+            self.main_window.master_data.subscribe(self.master_listener)
+            self.fillFilters()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        if self.master_listener is not None and not event.spontaneous():
+            self.main_window.master_data.unsubscribe(self.master_listener)
+            self.master_listener = None
+        super().hideEvent(event)
+
+    def onMasterDataChanged(self, table, old_row, new_row):
+        if table in ('zones', 'factories'):
+            self.fillFilters()
+
+    def search(self):
+        self.search_timer.stop()
+        text = self.search_input.text()
+        first_date = last_date = None
+        if self.range_check.isChecked():
+            first_date = self.first_date.date().toString('yyyy-MM-dd')
+            last_date = self.last_date.date().toString('yyyy-MM-dd')
+        zone = self.zone_combo.currentText() if self.zone_combo.currentIndex() > 0 else ''
+        factory = self.factory_combo.currentText() if self.factory_combo.currentIndex() > 0 else ''
+
+        started = time.perf_counter()
+        # A még ki nem írt mentések is szerepeljenek a találatok között
+        try:
+            self.main_window.write_queue.flush()
+        except RuntimeError as e:
+            self.status_label.setText(str(e))
+            return
+        self.results = self.main_window.repository.searchDeliveries(text, first_date, last_date, zone, factory)
+        elapsed = (time.perf_counter() - started) * 1000
+        self.showResults()
+
+        if not self.results and not any(len(term) >= SEARCH_MIN_LENGTH for term in text.split()):
+            self.status_label.setText(f"Legalább {SEARCH_MIN_LENGTH} karakteres szövegrészt adjon meg")
+        else:
+            more = "+" if len(self.results) >= SEARCH_LIMIT else ""
+            self.status_label.setText(f"{len(self.results)}{more} találat ({elapsed:.1f} ms)")
+
+    def showResults(self):
+        self.result_table.setRowCount(len(self.results))
+        for row, data in enumerate(self.results):
+            values = [data['date'], data['km_range'], data['factory'], data['address'],
+                      data['delivery_number'], f"{data['m3_total'] or 0:.1f}"]
+            for col, value in enumerate(values):
+                self.result_table.setItem(row, col, QTableWidgetItem(value or ""))
+        self.result_table.resizeColumnsToContents()
+        if self.results:
+            self.result_table.selectRow(0)
+
+    def openSelected(self):
+        # Enter a keresőmezőben: az első (kijelölt) találat napjára ugrik
+        if self.search_timer.isActive():
+            self.search()
+        row = self.result_table.currentRow()
+        if row < 0 and self.results:
+            row = 0
+        if row >= 0:
+            self.openRow(row)
+
+    def openRow(self, row):
+        if 0 <= row < len(self.results):
+            self.main_window.jumpToDate(self.results[row]['date'])
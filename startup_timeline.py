@@ -0,0 +1,58 @@
+# Indítási idővonal: a main.py legelső importja, így az időmérés a folyamat
+# indulásához közel kezdődik. Az importok és a felület építésének lépései
+# ezredmásodpercben, a -X importtime kimenetéhez hasonló bontásban.
+import importlib
+import json
+import sys
+import time
+
+_started = time.perf_counter()
+
+
+class StartupTimeline:
+    def __init__(self):
+        self.marks = []
+        self.imports = []
+        # Egy lépésen belül külön mért részek, pl. sémaváltozások
+        self.details = []
+        self.last = _started
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.marks.append({
+            'name': name,
+            'at_ms': round((now - _started) * 1000, 2),
+            'step_ms': round((now - self.last) * 1000, 2)
+        })
+        self.last = now
+
+    def detail(self, name, ms):
+        self.details.append({'name': name, 'ms': ms})
+
+    def lazyImport(self, name):
+        # Nehéz modulok betöltése az első használatkor, az idő rögzítésével
+        module = sys.modules.get(name)
+        if module is not None:
+            return module
+        started = time.perf_counter()
+        module = importlib.import_module(name)
+        self.imports.append({
+            'module': name,
+            'at_ms': round((started - _started) * 1000, 2),
+            'import_ms': round((time.perf_counter() - started) * 1000, 2)
+        })
+        return module
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'marks': self.marks, 'details': self.details, 'lazy_imports': self.imports},
+                      f, ensure_ascii=False, indent=2)
+
+    def summary(self):
+        lines = [f"{m['at_ms']:>9.1f} ms  (+{m['step_ms']:.1f})  {m['name']}" for m in self.marks]
+        lines += [f"{d['ms']:>9.1f} ms  {d['name']}" for d in self.details]
+        lines += [f"{i['at_ms']:>9.1f} ms  import {i['module']}: {i['import_ms']:.1f} ms" for i in self.imports]
+        return "\n".join(lines)
+
+
+timeline = StartupTimeline()
@@ -0,0 +1,136 @@
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PySide6.QtGui import QFont
+from datetime import timedelta
+from month_data import DAY_NAMES
+
+
+# Dátum szerinti sorokból álló táblázat modell. Az adatok oszloponként,
+# sima listákban vannak tárolva, a nézet csak a látható cellákat kéri le.
+class DateTableModel(QAbstractTableModel):
+    def __init__(self, headers, day_name_column=None, formats=None, parent=None):
+        super().__init__(parent)
+        self.headers = list(headers)
+        self.day_name_column = day_name_column
+        # oszlop -> formátum (pl. "{:.1f}"), csak a megjelenítéshez
+        self.formats = formats or {}
+        self.days = []
+        self.columns = [[] for _ in self.headers]
+        # Dátum -> sor index
+        self.date_rows = {}
+        # Mentés előtti előnézeti szövegek: (sor, oszlop) -> szöveg
+        self.previews = {}
+        # Opcionális összesítő sor a napok után, a Dátum oszlopban a felirattal
+        self.summary = None
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.days) + (self.summary is not None)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        if row >= len(self.days):
+            return self.summaryData(col, role)
+        if role == Qt.DisplayRole:
+            return self.displayText(row, col)
+        if role == Qt.TextAlignmentRole and (col == 0 or col == self.day_name_column):
+            return int(Qt.AlignCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal:
+            if role == Qt.DisplayRole and section < len(self.headers):
+                return self.headers[section]
+            if role == Qt.TextAlignmentRole:
+                return int(Qt.AlignCenter)
+        return super().headerData(section, orientation, role)
+
+    def setDateRange(self, first_day, days):
+        # Az egész tartalom cseréje egyetlen reset-tel
+        self.beginResetModel()
+        self.days = [first_day + timedelta(days=i) for i in range(days)]
+        dates = [day.isoformat() for day in self.days]
+        self.columns = [[None] * days for _ in self.headers]
+        self.columns[0] = dates
+        self.date_rows = {date_text: row for row, date_text in enumerate(dates)}
+        self.previews = {}
+        self.summary = None
+        self.endResetModel()
+
+    def rowForDate(self, date_text):
+        return self.date_rows.get(str(date_text), -1)
+
+    def value(self, row, col):
+        if col == self.day_name_column:
+            return DAY_NAMES[self.days[row].weekday()]
+        return self.columns[col][row]
+
+    def displayText(self, row, col):
+        preview = self.previews.get((row, col))
+        if preview is not None:
+            return preview
+        return self.formatValue(col, self.value(row, col))
+
+    def setValue(self, row, col, value):
+        self.setValues([(row, col, value)])
+
+    def setValues(self, updates):
+        # Tömeges frissítés: egyetlen dataChanged a módosított téglalapra
+        top = left = None
+        bottom = right = -1
+        for row, col, value in updates:
+            self.columns[col][row] = value
+            self.previews.pop((row, col), None)
+            top = row if top is None else min(top, row)
+            left = col if left is None else min(left, col)
+            bottom = max(bottom, row)
+            right = max(right, col)
+        if top is not None:
+            self.dataChanged.emit(self.index(top, left), self.index(bottom, right), [Qt.DisplayRole])
+
+    def addValue(self, row, col, amount):
+        current = self.columns[col][row]
+        self.setValue(row, col, (current or 0) + amount)
+
+    def setPreview(self, row, col, text):
+        self.previews[(row, col)] = text
+        index = self.index(row, col)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole])
+
+    def formatValue(self, col, value):
+        if value is None:
+            return ""
+        fmt = self.formats.get(col)
+        if fmt and isinstance(value, (int, float)):
+            return fmt.format(value)
+        return str(value)
+
+    def setSummary(self, label, values):
+        # values: a Dátum utáni oszlopok értékei
+        row = len(self.days)
+        summary = [label] + list(values)
+        if self.summary is None:
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.summary = summary
+            self.endInsertRows()
+        else:
+            self.summary = summary
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.headers) - 1), [Qt.DisplayRole])
+
+    def summaryData(self, col, role):
+        if role == Qt.DisplayRole:
+            return self.formatValue(col, self.summary[col]) if col < len(self.summary) else ""
+        if role == Qt.FontRole:
+            font = QFont()
+            font.setBold(True)
+            return font
+        if role == Qt.TextAlignmentRole and col == 0:
+            return int(Qt.AlignCenter)
+        return None
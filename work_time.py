@@ -0,0 +1,181 @@
+# Munkaidő számítás egész percekben. Egy időszak (általában egy hónap) napjaihoz
+# munkatípusonként egy-egy perc tömb tartozik; a heti és havi összegek ezekből
+# egyetlen menetben készülnek, egy nap módosításakor pedig csak a különbség
+# kerül át a heti és havi összegbe.
+from array import array
+from datetime import date, timedelta
+
+WORK_TYPE = "Sima munkanap"
+WORKSHOP_TYPE = "Műhely nap"
+LEAVE_TYPE = "Szabadság"
+SICK_LEAVE_TYPE = "Betegszabadság (TP)"
+WORK_TYPES = [WORK_TYPE, WORKSHOP_TYPE, LEAVE_TYPE, SICK_LEAVE_TYPE]
+WORKSHOP = WORK_TYPES.index(WORKSHOP_TYPE)
+LEAVE_TYPES = {WORK_TYPES.index(LEAVE_TYPE), WORK_TYPES.index(SICK_LEAVE_TYPE)}
+# A ledolgozott időbe számító típusok
+WORKED_TYPES = [WORK_TYPES.index(WORK_TYPE), WORKSHOP]
+
+DAY_MINUTES = 24 * 60
+# Időpontok nélkül rögzített szabadság vagy TP ennyi percnek számít
+LEAVE_DAY_MINUTES = 8 * 60
+
+
+def parseMinutes(time_text):
+    # 'HH:MM' -> perc a nap kezdetétől, hibás vagy üres értéknél None
+    try:
+        hours, minutes = time_text.split(':')[:2]
+        value = int(hours) * 60 + int(minutes)
+    except (AttributeError, ValueError):
+        return None
+    return value if 0 <= value < DAY_MINUTES else None
+
+
+def shiftMinutes(start_text, end_text):
+    # Éjfélen átnyúló műszaknál a végzés a következő napra esik
+    start, end = parseMinutes(start_text), parseMinutes(end_text)
+    if start is None or end is None:
+        return None
+    return (end - start) % DAY_MINUTES
+
+
+def typeIndex(work_type):
+    # A régi, típus nélküli bejegyzések sima munkanapok
+    return WORK_TYPES.index(work_type) if work_type in WORK_TYPES else 0
+
+
+class WorkMonth:
+    # Naponként egy fő bejegyzés (sima munkanap, szabadság vagy TP) és egy
+    # műhely bejegyzés; mindkettőnél a legutolsó mentés számít.
+    def __init__(self, first_day, days):
+        self.first_day = first_day
+        self.days = days
+        self.entries = [None] * days   # (típus, kezdés, végzés)
+        self.workshop = [None] * days  # (kezdés, végzés)
+        self.minutes = [array('i', [0]) * days for _ in WORK_TYPES]
+
+        # Hetek hétfőtől vasárnapig, az időszak első napjának hetétől
+        offset = first_day.weekday()
+        self.week_of_day = array('i', [(day + offset) // 7 for day in range(days)])
+        week_count = self.week_of_day[-1] + 1 if days else 0
+        monday = first_day - timedelta(days=offset)
+        self.weeks = [monday + timedelta(weeks=week) for week in range(week_count)]
+        self.week_totals = [array('i', [0]) * week_count for _ in WORK_TYPES]
+        self.totals = array('i', [0]) * len(WORK_TYPES)
+        self.day_counts = array('i', [0]) * len(WORK_TYPES)
+
+    def dayIndex(self, date_text):
+        index = (date.fromisoformat(str(date_text)) - self.first_day).days
+        return index if 0 <= index < self.days else -1
+
+    def fill(self, rows):
+        # Először a bejegyzések naponként, utána a percek és az összegek egy menetben
+        for row in rows:
+            index = self.dayIndex(row['date'])
+            if index >= 0:
+                self.store(index, row)
+        for index in range(self.days):
+            for work_type, value in enumerate(self.dayMinutes(index)):
+                self.minutes[work_type][index] = value
+        self.recount()
+
+    def recount(self):
+        for work_type, minutes in enumerate(self.minutes):
+            weekly = array('i', [0]) * len(self.weeks)
+            count = 0
+            for index, value in enumerate(minutes):
+                if value:
+                    weekly[self.week_of_day[index]] += value
+                    count += 1
+            self.week_totals[work_type] = weekly
+            self.totals[work_type] = sum(weekly)
+            self.day_counts[work_type] = count
+
+    def store(self, index, row):
+        work_type = typeIndex(row.get('type'))
+        start_text, end_text = row.get('start_time') or None, row.get('end_time') or None
+        if not (start_text and end_text) and work_type not in LEAVE_TYPES:
+            return
+        if work_type == WORKSHOP:
+            self.workshop[index] = (start_text, end_text)
+        else:
+            self.entries[index] = (work_type, start_text, end_text)
+
+    def dayMinutes(self, index):
+        # Típusonkénti percek egy napra a bejegyzéseiből
+        values = [0] * len(WORK_TYPES)
+        entry = self.entries[index]
+        if entry:
+            work_type, start_text, end_text = entry
+            minutes = shiftMinutes(start_text, end_text) or 0
+            if work_type in LEAVE_TYPES and not minutes:
+                minutes = LEAVE_DAY_MINUTES
+            values[work_type] = minutes
+        if self.workshop[index]:
+            values[WORKSHOP] = shiftMinutes(*self.workshop[index]) or 0
+        return values
+
+    def setDay(self, row):
+        # Egy nap módosítása: csak a változott percek különbsége kerül az összegekbe
+        index = self.dayIndex(row['date'])
+        if index < 0:
+            return -1
+        self.store(index, row)
+        week = self.week_of_day[index]
+        for work_type, value in enumerate(self.dayMinutes(index)):
+            old = self.minutes[work_type][index]
+            if value != old:
+                self.minutes[work_type][index] = value
+                self.week_totals[work_type][week] += value - old
+                self.totals[work_type] += value - old
+                self.day_counts[work_type] += bool(value) - bool(old)
+        return index
+
+    def workedMinutes(self, index):
+        return sum(self.minutes[work_type][index] for work_type in WORKED_TYPES)
+
+    def dayValues(self, index):
+        # A táblázat sorának értékei a Munka KB oszloptól:
+        # Munka KB, Munka BF, Ledolgozott óra, Műhely KB, Műhely BF, Munka típusa
+        entry = self.entries[index]
+        start_text = end_text = work_type = None
+        if entry:
+            start_text, end_text = entry[1], entry[2]
+            work_type = WORK_TYPES[entry[0]]
+        workshop_start, workshop_end = self.workshop[index] or (None, None)
+        worked = self.workedMinutes(index)
+        hours = worked / 60 if worked or (entry and entry[0] not in LEAVE_TYPES) else None
+        return [start_text, end_text, hours, workshop_start, workshop_end, work_type]
+
+    def workedTotal(self):
+        return sum(self.totals[work_type] for work_type in WORKED_TYPES)
+
+    def weekWorked(self, week):
+        return sum(self.week_totals[work_type][week] for work_type in WORKED_TYPES)
+
+    def weekLabel(self, week):
+        first = max(self.weeks[week], self.first_day)
+        last = min(self.weeks[week] + timedelta(days=6), self.first_day + timedelta(days=self.days - 1))
+        return f"{week + 1}. hét ({first:%m.%d}-{last:%m.%d})"
+
+    def summaryValues(self):
+        # Összesítő sor ugyanazokkal az oszlopokkal, mint a napi sorok
+        leave = [f"{WORK_TYPES[work_type]}: {self.day_counts[work_type]} nap"
+                 for work_type in sorted(LEAVE_TYPES) if self.day_counts[work_type]]
+        workshop = self.totals[WORKSHOP]
+        return [None, None, self.workedTotal() / 60,
+                f"{workshop / 60:.2f} óra" if workshop else None, None, ", ".join(leave) or None]
+
+    def summaryRows(self, label):
+        # Export: heti sorok, majd az időszak összesen; típusonként órában és napban
+        rows = []
+        for week in range(len(self.weeks)):
+            rows.append([f"{label} {self.weekLabel(week)}", self.weekWorked(week) / 60]
+                        + [self.week_totals[work_type][week] / 60 for work_type in range(len(WORK_TYPES))])
+        rows.append([f"{label} összesen", self.workedTotal() / 60]
+                    + [self.totals[work_type] / 60 for work_type in range(len(WORK_TYPES))]
+                    + [self.day_counts[work_type] for work_type in range(len(WORK_TYPES))])
+        return rows
+
+
+SUMMARY_HEADERS = (["Időszak", "Ledolgozott óra"] + [f"{work_type} (óra)" for work_type in WORK_TYPES]
+                   + [f"{work_type} (nap)" for work_type in WORK_TYPES])
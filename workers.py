@@ -0,0 +1,83 @@
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Qt
+from PySide6.QtWidgets import QProgressDialog
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobSignals(QObject):
+    progress = Signal(int, int)  # kész, összes
+    finished = Signal(object)
+    failed = Signal(str)
+    cancelled = Signal()
+
+
+# Háttérben futó feladat. A függvény a 'progress' hívással jelzi az
+# előrehaladást; megszakítás után a következő jelzésnél JobCancelled keletkezik.
+class Job(QRunnable):
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = JobSignals()
+        self.is_cancelled = False
+
+    def cancel(self):
+        self.is_cancelled = True
+
+    def progress(self, done, total):
+        if self.is_cancelled:
+            raise JobCancelled()
+        self.signals.progress.emit(done, total)
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, progress=self.progress, **self.kwargs)
+        except JobCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+
+class JobRunner(QObject):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool.globalInstance()
+        # A futó feladatokra hivatkozást tartunk, amíg be nem fejeződnek
+        self.jobs = set()
+
+    def start(self, title, job, on_finished, on_failed=None):
+        dialog = QProgressDialog(title, "Mégse", 0, 0, self.parent())
+        dialog.setWindowTitle(title)
+        dialog.setMinimumDuration(300)
+        dialog.setAutoClose(False)
+        dialog.setAutoReset(False)
+        dialog.canceled.connect(job.cancel)
+
+        def progress(done, total):
+            dialog.setMaximum(total)
+            dialog.setValue(done)
+
+        def finish():
+            self.jobs.discard(job)
+            dialog.close()
+
+        job.signals.progress.connect(progress, Qt.QueuedConnection)
+        job.signals.finished.connect(lambda result: (finish(), on_finished(result)), Qt.QueuedConnection)
+        job.signals.failed.connect(lambda message: (finish(), on_failed and on_failed(message)), Qt.QueuedConnection)
+        job.signals.cancelled.connect(finish, Qt.QueuedConnection)
+
+        self.jobs.add(job)
+        job.setAutoDelete(False)
+        self.pool.start(job)
+        return job
+
+    def cancelAll(self):
+        # Kilépéskor: minden futó feladat megszakítása, majd megvárjuk őket
+        for job in list(self.jobs):
+            job.cancel()
+        self.pool.waitForDone()
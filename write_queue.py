@@ -0,0 +1,134 @@
+import queue
+import threading
+import time
+from profiler import profiler
+
+# Tartóssági szabályok:
+#   'batch'    - minden összegyűjtött köteg után commit
+#   'count'    - legalább 'every' rekordonként commit
+#   'interval' - legfeljebb 'interval' másodpercenként commit
+POLICIES = ('batch', 'count', 'interval')
+
+# Egy kötegbe legfeljebb ennyi rekordot gyűjtünk
+MAX_BATCH = 500
+
+# flush várakozás közben ilyen gyakran nézzük, hogy él-e még a szál (másodperc)
+FLUSH_POLL = 0.5
+
+# Mentési hibánál legfeljebb ennyi elveszett napot sorolunk fel
+MAX_LOST_DATES = 10
+
+
+def lostMessage(rows, error):
+    dates = sorted({str(row.get('date')) for row in rows})
+    shown = ", ".join(dates[:MAX_LOST_DATES]) + (", ..." if len(dates) > MAX_LOST_DATES else "")
+    return f"{error}\n{len(rows)} bejegyzés nem került mentésre ({shown})"
+
+
+class WriteQueue:
+    def __init__(self, repository, policy='batch', every=50, interval=1.0,
+                 on_commit=None, on_error=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Ismeretlen tartóssági szabály: {policy}")
+        self.repository = repository
+        self.policy = policy
+        self.every = every
+        self.interval = interval
+        self.on_commit = on_commit
+        self.on_error = on_error
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.run, name="WriteQueue", daemon=True)
+        self.thread.start()
+
+    def put(self, kind, data):
+        # kind: 'work_hours' vagy 'deliveries'
+        self.queue.put((kind, data))
+
+    def flush(self):
+        # Megvárja, amíg minden eddig beküldött rekord commitolva van.
+        # Leállt szál esetén hibát dob, nem vár örökké.
+        done = threading.Event()
+        self.queue.put(('flush', done))
+        while not done.wait(FLUSH_POLL):
+            if not self.thread.is_alive():
+                raise RuntimeError("A mentési szál leállt, a várakozó bejegyzések nem kerültek mentésre")
+
+    def close(self):
+        self.queue.put(('stop', None))
+        self.thread.join()
+
+    def run(self):
+        # A rekordok a commitig a memóriában várnak ('work_hours' és 'deliveries' szerint)
+        pending_work, pending_deliveries = [], []
+        last_commit = time.monotonic()
+        running = True
+
+        while running:
+            pending = len(pending_work) + len(pending_deliveries)
+            timeout = self.interval if self.policy == 'interval' and pending else None
+            try:
+                items = [self.queue.get(timeout=timeout)]
+            except queue.Empty:
+                items = []
+            # Ami közben összegyűlt, egy kötegbe kerül
+            while items and len(items) < MAX_BATCH:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            waiters = []
+            for kind, data in items:
+                if kind == 'work_hours':
+                    pending_work.append(data)
+                elif kind == 'deliveries':
+                    pending_deliveries.append(data)
+                elif kind == 'flush':
+                    waiters.append(data)
+                elif kind == 'stop':
+                    running = False
+
+            lost = []
+            try:
+                pending = len(pending_work) + len(pending_deliveries)
+                if pending and (waiters or not running or self.shouldCommit(pending, last_commit)):
+                    lost = pending_work + pending_deliveries
+                    work_rows, delivery_rows = pending_work, pending_deliveries
+                    pending_work, pending_deliveries = [], []
+                    self.write(work_rows, delivery_rows)
+                    lost = []
+                    last_commit = time.monotonic()
+                    if self.on_commit:
+                        self.on_commit(pending)
+            except Exception as e:
+                # Bármilyen hiba (adatbázis, hibás rekord, visszahívás) után a szál fut tovább;
+                # a visszagörgetett köteg rekordjai elvesznek, ezt a hibaüzenet jelzi
+                if self.on_error:
+                    self.on_error(lostMessage(lost, e) if lost else str(e))
+            finally:
+                for done in waiters:
+                    done.set()
+
+    def write(self, work_rows, delivery_rows):
+        # A beszúrás és a commit egyetlen zárolás alatt fut: a kapcsolatot a GUI is
+        # használja, így közben más tranzakció nem commitolhatja idő előtt és nem
+        # görgetheti vissza a sorainkat
+        repository = self.repository
+        with profiler.span('WriteQueue.batch') as span, repository.lock:
+            span.rows = len(work_rows) + len(delivery_rows)
+            try:
+                if work_rows:
+                    repository.insertWorkHours(work_rows)
+                if delivery_rows:
+                    repository.insertDeliveries(delivery_rows)
+                repository.commit()
+            except Exception:
+                repository.rollback()
+                raise
+
+    def shouldCommit(self, pending, last_commit):
+        if self.policy == 'batch':
+            return True
+        if self.policy == 'count':
+            return pending >= self.every
+        return time.monotonic() - last_commit >= self.interval
@@ -0,0 +1,71 @@
+from bisect import bisect_left, bisect_right
+from pricing import zoneKey
+
+# A zones táblában nem szereplő sávokra a régi 5 km-es felosztás marad
+DEFAULT_ZONE_BOUNDS = list(range(0, 55, 5))
+
+
+def parseZone(zone_text):
+    # "Övezet 5-10" vagy "5-10" -> (5, 10); felismerhetetlen névnél None
+    try:
+        start_text, end_text = zoneKey(zone_text).split('-')
+        start, end = int(start_text), int(end_text)
+    except (AttributeError, ValueError):
+        return None
+    return (start, end) if start < end else None
+
+
+def zoneLabel(start, end):
+    return f"Övezet {start}-{end}"
+
+
+class ZoneRegistry:
+    # Rendezett, át nem fedő km sávok. A fuvar táblázat oszlopai ebben a
+    # sorrendben követik egymást: 0. a dátum, utánuk a sávok, végül az összeg.
+    def __init__(self, zone_rows=()):
+        intervals = {}
+        for row in zone_rows:
+            bounds = parseZone(row['nev'])
+            if bounds:
+                intervals[bounds] = row['alapdij'] or 0
+
+        # Átfedő sávok közül a korábban kezdődő (azonos kezdetnél a rövidebb) marad
+        accepted = {}
+        last_end = None
+        for (start, end), fee in sorted(intervals.items()):
+            if last_end is None or start >= last_end:
+                accepted[(start, end)] = fee
+                last_end = end
+        for start, end in zip(DEFAULT_ZONE_BOUNDS, DEFAULT_ZONE_BOUNDS[1:]):
+            if not any(start < e and s < end for s, e in accepted):
+                accepted[(start, end)] = 0
+
+        self.starts, self.ends, self.fees = [], [], []
+        for (start, end), fee in sorted(accepted.items()):
+            self.starts.append(start)
+            self.ends.append(end)
+            self.fees.append(fee)
+
+        self.labels = [zoneLabel(s, e) for s, e in zip(self.starts, self.ends)]
+        self.headers = ["Dátum"] + self.labels + ["Összeg"]
+        self.amount_column = len(self.headers) - 1
+
+    def zoneForKm(self, km):
+        # km -> sáv neve, vagy None, ha egyik sávba sem esik
+        index = bisect_right(self.starts, km) - 1
+        if index >= 0 and km < self.ends[index]:
+            return self.labels[index]
+        return None
+
+    def column(self, zone_text):
+        # Sáv neve -> oszlop a fuvar táblázatban, ismeretlen sávnál 0
+        bounds = parseZone(zone_text)
+        if bounds is None:
+            return 0
+        index = bisect_left(self.starts, bounds[0])
+        if index < len(self.starts) and (self.starts[index], self.ends[index]) == bounds:
+            return index + 1
+        return 0
+
+    def zoneColumns(self):
+        return range(1, self.amount_column)